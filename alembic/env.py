@@ -4,6 +4,7 @@ from sqlalchemy import pool
 from alembic import context
 from app.core.config import settings
 from app.db.base import Base
+from app.db.partitions import STATUS_HISTORY_TABLE
 
 # Import all models here
 from app.models.organization import Organization
@@ -24,11 +25,19 @@ config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
 target_metadata = Base.metadata
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Skip monthly history partitions, which app.db.partitions manages outside of migrations."""
+    table = object if type_ == "table" else getattr(object, "table", None)
+    if reflected and compare_to is None and table is not None:
+        return not table.name.startswith(f"{STATUS_HISTORY_TABLE}_")
+    return True
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -46,7 +55,8 @@ def run_migrations_online() -> None:
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
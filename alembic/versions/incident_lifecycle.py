@@ -0,0 +1,42 @@
+"""incident is_active flag and partial index on active incidents
+
+Revision ID: incident_lifecycle
+Revises: incident_search
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers
+revision = 'incident_lifecycle'
+down_revision = 'incident_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'incidents',
+        sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.true())
+    )
+    # resolved_at was never set by incident updates, fall back to the last change
+    op.execute(
+        "UPDATE incidents "
+        "SET is_active = false, resolved_at = coalesce(resolved_at, updated_at) "
+        "WHERE status = 'RESOLVED'"
+    )
+    op.execute(
+        "UPDATE incidents SET resolved_at = NULL "
+        "WHERE status <> 'RESOLVED' AND resolved_at IS NOT NULL"
+    )
+    op.create_index(
+        'ix_incidents_active_organization_id_created_at_id',
+        'incidents',
+        ['organization_id', 'created_at', 'id'],
+        postgresql_where=sa.text('is_active')
+    )
+
+
+def downgrade():
+    op.drop_index('ix_incidents_active_organization_id_created_at_id', table_name='incidents')
+    op.drop_column('incidents', 'is_active')
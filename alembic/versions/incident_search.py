@@ -0,0 +1,42 @@
+"""full-text search vectors on incidents and incident updates
+
+Revision ID: incident_search
+Revises: outbox_events
+Create Date: 2026-10-18
+
+Adding stored generated columns rewrites both tables, so run this in a
+maintenance window on large installations.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = 'incident_search'
+down_revision = 'outbox_events'
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTORS = [
+    (
+        'incidents',
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+    ),
+    ('incident_updates', "to_tsvector('english', message)"),
+]
+
+
+def upgrade():
+    for table, expression in SEARCH_VECTORS:
+        op.add_column(
+            table,
+            sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(expression, persisted=True))
+        )
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], postgresql_using='gin')
+
+
+def downgrade():
+    for table, _ in reversed(SEARCH_VECTORS):
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
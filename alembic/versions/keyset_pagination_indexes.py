@@ -0,0 +1,33 @@
+"""indexes for keyset pagination on (created_at, id)
+
+Revision ID: keyset_pagination_indexes
+Revises: service_status_index
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+# revision identifiers
+revision = 'keyset_pagination_indexes'
+down_revision = 'service_status_index'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_services_organization_id_created_at_id', 'services', ['organization_id', 'created_at', 'id']),
+    ('ix_service_status_history_service_id_created_at_id', 'service_status_history', ['service_id', 'created_at', 'id']),
+    ('ix_incidents_created_at_id', 'incidents', ['created_at', 'id']),
+    ('ix_incidents_organization_id_created_at_id', 'incidents', ['organization_id', 'created_at', 'id']),
+    ('ix_incidents_service_id_created_at_id', 'incidents', ['service_id', 'created_at', 'id']),
+    ('ix_incident_updates_incident_id_created_at_id', 'incident_updates', ['incident_id', 'created_at', 'id']),
+    ('ix_users_organization_id_created_at_id', 'users', ['organization_id', 'created_at', 'id']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,66 @@
+"""partition service_status_history by month
+
+Revision ID: partition_status_history
+Revises: service_status_daily
+Create Date: 2026-10-18
+"""
+from datetime import timezone
+from alembic import op
+import sqlalchemy as sa
+from app.db.partitions import STATUS_HISTORY_TABLE, ensure_partitions
+
+# revision identifiers
+revision = 'partition_status_history'
+down_revision = 'service_status_daily'
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, service_id, old_status, new_status, notes, created_at, updated_at"
+
+
+def _create_history_table(partitioned):
+    op.execute(f"""
+        CREATE TABLE service_status_history (
+            id UUID NOT NULL,
+            service_id UUID NOT NULL REFERENCES services (id),
+            old_status VARCHAR NOT NULL,
+            new_status VARCHAR NOT NULL,
+            notes VARCHAR,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT service_status_history_pkey PRIMARY KEY {"(id, created_at)" if partitioned else "(id)"},
+            CONSTRAINT valid_old_status CHECK (old_status IN ('operational', 'degraded', 'partial_outage', 'major_outage')),
+            CONSTRAINT valid_new_status CHECK (new_status IN ('operational', 'degraded', 'partial_outage', 'major_outage'))
+        ) {"PARTITION BY RANGE (created_at)" if partitioned else ""}
+    """)
+    op.create_index(
+        'ix_service_status_history_service_id_created_at_id',
+        'service_status_history',
+        ['service_id', 'created_at', 'id']
+    )
+
+
+def _swap_history_table(partitioned):
+    op.execute("ALTER TABLE service_status_history RENAME TO service_status_history_old")
+    op.execute("ALTER TABLE service_status_history_old RENAME CONSTRAINT service_status_history_pkey TO service_status_history_old_pkey")
+    op.execute("DROP INDEX ix_service_status_history_service_id_created_at_id")
+    _create_history_table(partitioned)
+
+
+def upgrade():
+    _swap_history_table(partitioned=True)
+
+    connection = op.get_bind()
+    oldest = connection.execute(sa.text("SELECT min(created_at) FROM service_status_history_old")).scalar()
+    # Partitions are bounded by UTC months, whatever the session time zone
+    since = oldest.astimezone(timezone.utc).date() if oldest else None
+    ensure_partitions(connection, STATUS_HISTORY_TABLE, since=since)
+
+    op.execute(f"INSERT INTO service_status_history ({COLUMNS}) SELECT {COLUMNS} FROM service_status_history_old")
+    op.execute("DROP TABLE service_status_history_old")
+
+
+def downgrade():
+    _swap_history_table(partitioned=False)
+    op.execute(f"INSERT INTO service_status_history ({COLUMNS}) SELECT {COLUMNS} FROM service_status_history_old")
+    op.execute("DROP TABLE service_status_history_old CASCADE")
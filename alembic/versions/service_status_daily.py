@@ -0,0 +1,100 @@
+"""daily service status rollups
+
+Revision ID: service_status_daily
+Revises: keyset_pagination_indexes
+Create Date: 2026-10-18
+"""
+from datetime import datetime, timedelta, timezone
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from app.core.config import settings
+
+# revision identifiers
+revision = 'service_status_daily'
+down_revision = 'keyset_pagination_indexes'
+branch_labels = None
+depends_on = None
+
+STATUSES = ('operational', 'degraded', 'partial_outage', 'major_outage')
+
+# Rebuilds the rollups record_transitions would have written: every closed
+# interval between consecutive history rows (and from service creation to
+# the first row) is split over UTC days, and every transition counts on the
+# day it happened. The open interval since the last transition is added on
+# the fly by the uptime endpoint, as it is after deploy.
+BACKFILL = f"""
+    WITH history AS (
+        SELECT service_id, created_at, old_status, new_status,
+               lead(created_at) OVER w AS next_at,
+               row_number() OVER w AS position
+        FROM service_status_history
+        WINDOW w AS (PARTITION BY service_id ORDER BY created_at, id)
+    ),
+    intervals AS (
+        SELECT service_id, started_at AT TIME ZONE 'UTC' AS started_at, ended_at AT TIME ZONE 'UTC' AS ended_at, status
+        FROM (
+            SELECT services.id AS service_id,
+                   greatest(services.created_at, :horizon) AS started_at,
+                   history.created_at AS ended_at,
+                   history.old_status AS status
+            FROM services
+            JOIN history ON history.service_id = services.id AND history.position = 1
+            UNION ALL
+            SELECT service_id, greatest(created_at, :horizon), next_at, new_status
+            FROM history
+            WHERE next_at IS NOT NULL
+        ) AS clamped
+        WHERE ended_at > started_at
+    ),
+    entries AS (
+        SELECT service_id, day::date AS day, status,
+               extract(epoch FROM least(ended_at, day + interval '1 day') - greatest(started_at, day)) AS seconds,
+               0 AS transitions
+        FROM intervals,
+             LATERAL generate_series(
+                 date_trunc('day', started_at),
+                 ended_at - interval '1 microsecond',
+                 interval '1 day'
+             ) AS day
+        UNION ALL
+        SELECT service_id, (created_at AT TIME ZONE 'UTC')::date, new_status, 0, 1
+        FROM service_status_history
+        WHERE old_status <> new_status AND created_at >= :horizon
+    )
+    INSERT INTO service_status_daily (
+        service_id, day, {", ".join(f"{status}_seconds" for status in STATUSES)}, worst_status, transition_count
+    )
+    SELECT service_id, day,
+           {", ".join(f"coalesce(floor(sum(seconds) FILTER (WHERE status = '{status}')), 0)" for status in STATUSES)},
+           (ARRAY{list(STATUSES)})[max(array_position(ARRAY{list(STATUSES)}, status))],
+           sum(transitions)
+    FROM entries
+    GROUP BY service_id, day
+"""
+
+
+def upgrade():
+    op.create_table(
+        'service_status_daily',
+        sa.Column('service_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('services.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('operational_seconds', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('degraded_seconds', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('partial_outage_seconds', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('major_outage_seconds', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('worst_status', sa.String(), nullable=False),
+        sa.Column('transition_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.CheckConstraint(
+            "worst_status IN ('operational', 'degraded', 'partial_outage', 'major_outage')",
+            name='valid_worst_status'
+        )
+    )
+    op.get_bind().execute(
+        sa.text(BACKFILL),
+        {"horizon": datetime.now(timezone.utc) - timedelta(days=settings.UPTIME_ROLLUP_MAX_DAYS)}
+    )
+
+
+def downgrade():
+    op.drop_table('service_status_daily')
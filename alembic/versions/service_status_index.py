@@ -0,0 +1,25 @@
+"""index services by organization and status
+
+Revision ID: service_status_index
+Revises: initial_migration
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+# revision identifiers
+revision = 'service_status_index'
+down_revision = 'initial_migration'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_services_organization_id_status',
+        'services',
+        ['organization_id', 'status']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_services_organization_id_status', table_name='services')
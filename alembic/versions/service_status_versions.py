@@ -0,0 +1,27 @@
+"""per-organization services version for status snapshots
+
+Revision ID: service_status_versions
+Revises: incident_lifecycle
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers
+revision = 'service_status_versions'
+down_revision = 'incident_lifecycle'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'service_status_versions',
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('organizations.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='1'),
+    )
+
+
+def downgrade():
+    op.drop_table('service_status_versions')
@@ -1,8 +1,11 @@
-from typing import Generator
+import secrets
+from typing import AsyncGenerator, Generator, Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, AsyncSessionLocal
 from app.core.errors import APIError
-from fastapi import status, Depends
+from fastapi import status, Depends, Header
+from app.core.config import settings
 from uuid import UUID
 from app.models.organization import Organization
 
@@ -13,6 +16,10 @@ def get_db() -> Generator:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator:
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def verify_organization_exists(db: Session, organization_id: UUID) -> Organization:
     organization = db.query(Organization).filter(Organization.id == organization_id).first()
     if not organization:
@@ -20,4 +27,16 @@ def verify_organization_exists(db: Session, organization_id: UUID) -> Organizati
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Organization with id {organization_id} not found"
         )
-    return organization 
\ No newline at end of file
+    return organization 
+
+async def organization_exists(organization_id: UUID) -> bool:
+    """Existence check on its own short session, for long-lived connections that must not hold one."""
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(Organization.id).where(Organization.id == organization_id)) is not None
+
+def verify_internal_token(x_internal_token: Optional[str] = Header(None)) -> None:
+    """Guard for operational endpoints that must not be reachable from the public API."""
+    if not settings.INTERNAL_API_TOKEN:
+        raise APIError(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_internal_token or not secrets.compare_digest(x_internal_token, settings.INTERNAL_API_TOKEN):
+        raise APIError(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid internal token")
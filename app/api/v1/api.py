@@ -1,5 +1,6 @@
-from fastapi import APIRouter
-from app.api.v1.endpoints import organizations, services, incidents, incident_updates, users, auth
+from fastapi import APIRouter, Depends
+from app.api import deps
+from app.api.v1.endpoints import organizations, services, incidents, incident_updates, users, auth, internal, websocket, events
 
 api_router = APIRouter()
 api_router.include_router(organizations.router, prefix="/organizations", tags=["organizations"])
@@ -7,4 +8,13 @@ api_router.include_router(services.router, prefix="/services", tags=["services"]
 api_router.include_router(incidents.router, prefix="/incidents", tags=["incidents"])
 api_router.include_router(incident_updates.router, prefix="/incident-updates", tags=["incident-updates"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(auth.router, prefix="/auth", tags=["auth"]) 
\ No newline at end of file
+api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+api_router.include_router(websocket.router, tags=["websocket"])
+api_router.include_router(events.router, tags=["events"])
+api_router.include_router(
+    internal.router,
+    prefix="/internal",
+    tags=["internal"],
+    include_in_schema=False,
+    dependencies=[Depends(deps.verify_internal_token)],
+)
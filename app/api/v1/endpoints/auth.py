@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
 from app.models.user import User
-from app.core.security import verify_password
+from app.core.security import verify_and_update_password
 from pydantic import BaseModel, EmailStr
 from app.schemas.user import User as UserSchema
 
@@ -13,14 +14,20 @@ class LoginRequest(BaseModel):
     password: str
 
 @router.post("/login", response_model=UserSchema)
-def login(
+async def login(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     login_data: LoginRequest
 ):
-    """Verify user credentials and return user data"""
-    user = db.query(User).filter(User.email == login_data.email).first()
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    """
+    Verify user credentials and return user data. The password check runs
+    on the hashing pool; hashes made with an outdated cost are replaced.
+    """
+    user = await db.scalar(select(User).where(User.email == login_data.email))
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await verify_and_update_password(login_data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -31,5 +38,10 @@ def login(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User is inactive"
         )
+
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        await db.refresh(user)
     
     return user 
\ No newline at end of file
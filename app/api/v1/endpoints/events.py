@@ -0,0 +1,118 @@
+from fastapi import APIRouter, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import logging
+from app.api import deps
+from app.core.config import settings
+from app.core.errors import NotFoundError
+from .websocket import (
+    MAX_SUBSCRIPTION_TOPICS,
+    RESYNC_FRAME,
+    StreamEvent,
+    Subscriber,
+    format_sse,
+    manager,
+    subscription_topics,
+)
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Comment line sent when the stream is idle so proxies keep the connection open
+KEEPALIVE_FRAME = ": keepalive\n\n"
+
+class EventSourceSubscriber(Subscriber):
+    """A Server-Sent Events subscriber, drained by the streaming response itself."""
+
+    resync_frame = format_sse(RESYNC_FRAME)
+    kind = "event stream"
+
+    def __init__(
+        self,
+        organization_id: str,
+        on_close: Callable[[Subscriber], None],
+        queue_size: int,
+        keepalive_seconds: float,
+    ):
+        super().__init__(organization_id, on_close, queue_size)
+        self.keepalive_seconds = keepalive_seconds
+
+    def render(self, event: StreamEvent) -> str:
+        return event.sse
+
+    def render_message(self, frame: str) -> str:
+        return format_sse(frame)
+
+    async def stream(self) -> AsyncIterator[str]:
+        try:
+            while not self.closed:
+                try:
+                    frame = await asyncio.wait_for(self.queue.get(), self.keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE_FRAME
+                    continue
+                if self.closed:
+                    break
+                yield frame
+                self._sent(frame)
+        finally:
+            self.close()
+
+def parse_last_event_id(last_event_id: Optional[str]) -> Tuple[Optional[str], Optional[int]]:
+    """Split a ``<stream id>:<seq>`` event id; unknown formats resume nothing."""
+    if not last_event_id:
+        return None, None
+    stream_id, _, seq = last_event_id.rpartition(":")
+    try:
+        return stream_id, int(seq)
+    except ValueError:
+        return None, None
+
+@router.get("/events/{organization_id}")
+async def organization_events(
+    organization_id: UUID,
+    services: List[str] = Query([]),
+    incidents: List[str] = Query([]),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Read-only organization event stream as Server-Sent Events, carrying the
+    same events as the websocket. Browsers resume automatically through the
+    Last-Event-ID header; a RESYNC event asks the client to refetch state.
+    Repeat ``services``/``incidents`` to receive events about those only.
+    """
+    topics = subscription_topics(services, incidents)
+    if len(topics) > MAX_SUBSCRIPTION_TOPICS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_SUBSCRIPTION_TOPICS} services and incidents can be subscribed to"
+        )
+    if not await deps.organization_exists(organization_id):
+        raise NotFoundError("Organization", organization_id)
+    stream_id, since = parse_last_event_id(last_event_id)
+    subscriber = EventSourceSubscriber(
+        str(organization_id),
+        manager.remove,
+        manager.queue_size,
+        settings.SSE_KEEPALIVE_SECONDS,
+    )
+    subscriber.topics = topics
+
+    async def events() -> AsyncIterator[str]:
+        # Registered only once the body is streamed, so it is always
+        # unregistered by stream() when the client goes away
+        manager.subscribe(subscriber, since=since, stream_id=stream_id)
+        async for frame in subscriber.stream():
+            yield frame
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop nginx from buffering the stream
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from typing import List, Optional
 from app.api import deps
+from app.core.incident_metrics import invalidate_incident_metrics
+from app.core.outbox import add_outbox_event, outbox_dispatcher
+from app.core.pagination import paginate
+from app.core.realtime import INCIDENT_UPDATED, incident_event, incident_update_event
+from app.crud.crud_incident import set_incident_status
 from app.schemas import incident_update as schemas
 from app.models.incident_update import IncidentUpdate
 from app.models.incident import Incident
@@ -30,17 +34,25 @@ def create_incident_update(
         update = IncidentUpdate(**update_in.dict())
         
         # Update incident status
-        incident.status = update_in.status
-        if update_in.status == "resolved":
-            incident.resolved_at = datetime.utcnow()
+        set_incident_status(incident, update_in.status)
 
         db.add(update)
         db.add(incident)
+        db.flush()
+        db.refresh(update)
+        db.refresh(incident)
+        add_outbox_event(db, incident.organization_id, incident_update_event(update, incident))
+        add_outbox_event(db, incident.organization_id, incident_event(INCIDENT_UPDATED, incident))
         db.commit()
         db.refresh(update)
-        
+        outbox_dispatcher.wake()
+        invalidate_incident_metrics(incident.organization_id)
+
         return update
 
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -51,17 +63,16 @@ def create_incident_update(
 @router.get("/incident/{incident_id}", response_model=List[schemas.IncidentUpdate])
 def get_incident_updates(
     incident_id: UUID,
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
 ):
     """Get all updates for an incident"""
-    updates = (
-        db.query(IncidentUpdate)
-        .filter(IncidentUpdate.incident_id == incident_id)
-        .order_by(IncidentUpdate.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    updates = paginate(
+        db.query(IncidentUpdate).filter(IncidentUpdate.incident_id == incident_id),
+        IncidentUpdate, response,
+        limit=limit, skip=skip, cursor=cursor
     )
     return updates 
\ No newline at end of file
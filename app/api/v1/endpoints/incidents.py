@@ -1,18 +1,25 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Query, Response, status, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import logging
 from app.api import deps
 from app.schemas import incident as schemas
+from app.schemas import incident_update as update_schemas
 from app.models.incident import Incident, IncidentStatus
 from app.models.service import Service
 from app.models.organization import Organization
 from app.models.user import User
 from app.core.errors import NotFoundError, ValidationError, APIError
+from app.core.incident_metrics import get_incident_metrics, invalidate_incident_metrics
+from app.core.outbox import add_outbox_event, outbox_dispatcher
+from app.core.pagination import NEXT_CURSOR_HEADER, paginate
+from app.crud import crud_incident
+from app.core.realtime import INCIDENT_CREATED, INCIDENT_UPDATED, incident_event
 from uuid import UUID
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import uuid
-from .websocket import manager  # Import the connection manager
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -20,7 +27,7 @@ router = APIRouter()
 @router.post("/", response_model=schemas.Incident)
 async def create_incident(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     incident_in: schemas.IncidentCreate
 ):
     """
@@ -30,7 +37,7 @@ async def create_incident(
         # First verify if the user exists if provided
         created_by_id = incident_in.created_by_id
         if created_by_id:
-            user = db.query(User).get(created_by_id)
+            user = await db.get(User, created_by_id)
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -38,9 +45,9 @@ async def create_incident(
                 )
         else:
             # Fallback to first active user in the system
-            created_by = db.query(User).filter(
-                User.is_active == True
-            ).first()
+            created_by = await db.scalar(
+                select(User).where(User.is_active == True).limit(1)
+            )
             if not created_by:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -49,7 +56,7 @@ async def create_incident(
             created_by_id = created_by.id
 
         # Verify service exists
-        service = db.query(Service).get(incident_in.service_id)
+        service = await db.get(Service, incident_in.service_id)
         if not service:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -60,40 +67,29 @@ async def create_incident(
         incident = Incident(
             title=incident_in.title,
             description=incident_in.description,
-            status=incident_in.status,
             impact=incident_in.impact,
             service_id=incident_in.service_id,
             organization_id=incident_in.organization_id,
             created_by_id=created_by_id
         )
+        crud_incident.set_incident_status(incident, incident_in.status)
         
         db.add(incident)
-        db.commit()
-        db.refresh(incident)
-        
-        logger.info(f"Created incident: {incident.id}")
+        await db.flush()
+        await db.refresh(incident)
 
-        # Broadcast the new incident to connected clients
-        await manager.broadcast_to_organization(
-            str(incident.organization_id),
-            {
-                "type": "INCIDENT_CREATED",
-                "data": {
-                    "id": str(incident.id),
-                    "title": incident.title,
-                    "description": incident.description,
-                    "status": incident.status,
-                    "impact": incident.impact,
-                    "service_id": str(incident.service_id),
-                    "created_at": incident.created_at.isoformat(),
-                }
-            }
-        )
+        # Broadcast the new incident to connected clients once committed
+        add_outbox_event(db, incident.organization_id, incident_event(INCIDENT_CREATED, incident))
+        await db.commit()
+        outbox_dispatcher.wake()
+        invalidate_incident_metrics(incident.organization_id)
+
+        logger.info(f"Created incident: {incident.id}")
 
         return incident
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating incident: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -102,14 +98,56 @@ async def create_incident(
 
 @router.get("/", response_model=List[schemas.Incident])
 def read_incidents(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
 ):
     """
-    Retrieve incidents.
+    Retrieve incidents, newest first.
     """
-    incidents = db.query(Incident).offset(skip).limit(limit).all()
+    incidents = paginate(
+        db.query(Incident), Incident, response,
+        limit=limit, skip=skip, cursor=cursor
+    )
+    return incidents
+
+@router.get("/active", response_model=List[schemas.Incident])
+def get_active_incidents(
+    response: Response,
+    db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    """
+    Get all active (unresolved) incidents.
+    """
+    incidents = paginate(
+        db.query(Incident).filter(Incident.is_active),
+        Incident, response,
+        limit=limit, skip=skip, cursor=cursor
+    )
+    return incidents
+
+@router.get("/organization/{organization_id}/active", response_model=List[schemas.Incident])
+def get_organization_active_incidents(
+    organization_id: UUID,
+    response: Response,
+    db: Session = Depends(deps.get_db),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    """
+    Get the active incidents of an organization, newest first. Served from
+    a partial index over active incidents only.
+    """
+    incidents = paginate(
+        db.query(Incident).filter(Incident.organization_id == organization_id, Incident.is_active),
+        Incident, response,
+        limit=limit, cursor=cursor
+    )
     return incidents
 
 @router.get("/{incident_id}", response_model=schemas.Incident)
@@ -129,6 +167,20 @@ def read_incident(
         )
     return incident
 
+@router.get("/{incident_id}/timeline", response_model=schemas.IncidentWithUpdates)
+def read_incident_timeline(
+    *,
+    db: Session = Depends(deps.get_db),
+    incident_id: UUID,
+):
+    """
+    Get an incident with all of its updates, oldest first.
+    """
+    incident = crud_incident.get_incident_timeline(db, incident_id)
+    if not incident:
+        raise NotFoundError("Incident", incident_id)
+    return incident
+
 @router.put("/{incident_id}", response_model=schemas.Incident)
 def update_incident(
     *,
@@ -146,50 +198,59 @@ def update_incident(
             detail="Incident not found"
         )
     
-    for field, value in incident_in.dict(exclude_unset=True).items():
+    changes = incident_in.dict(exclude_unset=True)
+    new_status = changes.pop("status", None)
+    resolved_at = changes.pop("resolved_at", None)
+    for field, value in changes.items():
         setattr(incident, field, value)
+    if new_status is not None or resolved_at is not None:
+        crud_incident.set_incident_status(incident, new_status or incident.status, resolved_at)
     
     db.add(incident)
+    db.flush()
+    db.refresh(incident)
+    add_outbox_event(db, incident.organization_id, incident_event(INCIDENT_UPDATED, incident))
     db.commit()
     db.refresh(incident)
+    outbox_dispatcher.wake()
+    invalidate_incident_metrics(incident.organization_id)
     return incident
 
 @router.get("/service/{service_id}", response_model=List[schemas.Incident])
 def read_service_incidents(
     *,
+    response: Response,
     db: Session = Depends(deps.get_db),
     service_id: str,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
 ):
     """
-    Get incidents for a specific service.
+    Get incidents for a specific service, newest first.
     """
-    incidents = (
-        db.query(Incident)
-        .filter(Incident.service_id == service_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    incidents = paginate(
+        db.query(Incident).filter(Incident.service_id == service_id),
+        Incident, response,
+        limit=limit, skip=skip, cursor=cursor
     )
     return incidents
 
 @router.get("/organization/{organization_id}", response_model=List[schemas.Incident])
 def get_organization_incidents(
     organization_id: UUID,
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
 ):
     """Get all incidents for an organization"""
     try:
-        incidents = (
-            db.query(Incident)
-            .filter(Incident.organization_id == organization_id)
-            .order_by(Incident.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+        incidents = paginate(
+            db.query(Incident).filter(Incident.organization_id == organization_id),
+            Incident, response,
+            limit=limit, skip=skip, cursor=cursor
         )
         
         # Convert any non-UUID4 to valid UUID4 for response
@@ -198,6 +259,8 @@ def get_organization_incidents(
                 incident.created_by_id = uuid.uuid4()
         
         return incidents
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"Error fetching incidents: {str(e)}")
         raise HTTPException(
@@ -205,28 +268,99 @@ def get_organization_incidents(
             detail="Failed to fetch incidents"
         )
 
-def is_valid_uuid4(uuid_string):
-    try:
-        uuid_obj = uuid.UUID(uuid_string)
-        return uuid_obj.version == 4
-    except ValueError:
-        return False
+@router.get("/organization/{organization_id}/recent", response_model=List[schemas.IncidentWithUpdates])
+def get_recent_organization_incidents(
+    organization_id: UUID,
+    response: Response,
+    db: Session = Depends(deps.get_db),
+    limit: int = Query(20, ge=1, le=100),
+    updates: int = Query(3, ge=0, le=50),
+    cursor: Optional[str] = None,
+):
+    """
+    Get the latest incidents of an organization, newest first, each with
+    its latest ``updates`` updates, newest first.
+    """
+    incidents, next_cursor = crud_incident.get_recent_incidents_with_updates(
+        db, organization_id, limit, updates, cursor
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [
+        schemas.IncidentWithUpdates(
+            **schemas.Incident.model_validate(incident).model_dump(),
+            updates=[update_schemas.IncidentUpdate.model_validate(update) for update in incident_updates]
+        )
+        for incident, incident_updates in incidents
+    ]
 
-@router.get("/active", response_model=List[schemas.Incident])
-def get_active_incidents(
+@router.get("/organization/{organization_id}/search", response_model=List[schemas.IncidentSearchResult])
+def search_organization_incidents(
+    organization_id: UUID,
+    response: Response,
     db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
+    q: str = Query(..., min_length=1, max_length=256),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
 ):
     """
-    Get all active (unresolved) incidents.
+    Search the incidents of an organization by title, description and
+    update messages, most relevant first. ``from``/``to`` limit the results
+    to incidents created in that range.
     """
-    incidents = (
-        db.query(Incident)
-        .filter(Incident.resolved_at.is_(None))
-        .order_by(Incident.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    results, next_cursor = crud_incident.search_incidents(
+        db, organization_id, q, limit, start=start, end=end, cursor=cursor
     )
-    return incidents 
\ No newline at end of file
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [
+        schemas.IncidentSearchResult(
+            **schemas.Incident.model_validate(incident).model_dump(),
+            rank=rank
+        )
+        for incident, rank in results
+    ]
+
+MAX_METRICS_WINDOW = timedelta(days=731)
+
+@router.get("/organization/{organization_id}/metrics", response_model=schemas.IncidentMetrics)
+def get_organization_incident_metrics(
+    organization_id: UUID,
+    db: Session = Depends(deps.get_db),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    group_by: schemas.MetricsGrouping = schemas.MetricsGrouping.SERVICE,
+):
+    """
+    Incident counts, time to resolve (MTTR) and time to identify of the
+    incidents opened in [from, to), grouped by service, impact or week.
+    Defaults to the last 90 days. Time to identify stands in for time to
+    detect, since incidents are only recorded once detected.
+    """
+    if end is None:
+        # Whole hours, so repeated default requests share a cache entry
+        now = datetime.now(timezone.utc)
+        end = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    if start is None:
+        start = end - timedelta(days=90)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    # Same instant, same cache entry, whatever offset the client sent
+    start = start.astimezone(timezone.utc)
+    end = end.astimezone(timezone.utc)
+    if start >= end:
+        raise ValidationError("from must be before to")
+    if end - start > MAX_METRICS_WINDOW:
+        raise ValidationError(f"The window may span at most {MAX_METRICS_WINDOW.days} days")
+    return get_incident_metrics(db, organization_id, start, end, group_by.value)
+
+def is_valid_uuid4(uuid_string):
+    try:
+        uuid_obj = uuid.UUID(uuid_string)
+        return uuid_obj.version == 4
+    except ValueError:
+        return False
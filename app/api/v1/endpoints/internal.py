@@ -0,0 +1,21 @@
+from fastapi import APIRouter
+from app.core.security import password_hash_metrics
+from app.db.pool_metrics import get_pool_stats
+from app.api.v1.endpoints.websocket import manager
+
+router = APIRouter()
+
+@router.get("/pool")
+def read_pool_stats():
+    """Connection pool usage and checkout wait times of this worker, for sizing pools."""
+    return get_pool_stats()
+
+@router.get("/connections")
+def read_connection_stats():
+    """Realtime subscribers of this worker and connect, disconnect and reap counters."""
+    return manager.get_stats()
+
+@router.get("/passwords")
+def read_password_hash_stats():
+    """Password hashing times and pool usage of this worker, for tuning BCRYPT_ROUNDS."""
+    return password_hash_metrics.snapshot()
@@ -1,15 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import case, func, insert, select, update
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.api import deps
 from app.schemas import service as schemas
-from app.models.service import Service, ServiceStatusHistory, ServiceStatus
+from app.models.service import Service, ServiceStatusHistory
 from app.models.organization import Organization
 from app.core.errors import NotFoundError, ValidationError, APIError
+from app.core.pagination import NEXT_CURSOR_HEADER, paginate
+from app.core.config import settings
+from app.core.outbox import add_outbox_event, outbox_dispatcher
+from app.core.realtime import (
+    SERVICE_CREATED,
+    SERVICE_DELETED,
+    SERVICE_UPDATED,
+    service_event,
+    service_status_event,
+)
+from app.crud import crud_service, crud_uptime
+from app.core.status_snapshot import (
+    get_status_snapshot,
+    invalidate_status_snapshot,
+    snapshot_response,
+)
 from uuid import UUID
+from datetime import datetime, timedelta, timezone
 
 router = APIRouter()
 
+def _change_status(db: Session, service: Service, new_status: str, notes: Optional[str]) -> None:
+    """
+    Move a locked service to ``new_status``, folding the old interval into
+    the uptime rollups, recording history and queueing the realtime event.
+    """
+    crud_uptime.record_transitions(db, {service.id: (service.status, new_status)})
+    db.add(ServiceStatusHistory(
+        service_id=service.id,
+        old_status=service.status,
+        new_status=new_status,
+        notes=notes
+    ))
+    add_outbox_event(db, service.organization_id, service_status_event(
+        service,
+        service.status,
+        new_status,
+        notes,
+        db.scalar(select(func.now())),
+    ))
+    service.status = new_status
+
 @router.post("/", response_model=schemas.Service)
 def create_service(
     *,
@@ -48,8 +87,13 @@ def create_service(
 
         db.add(service)
         db.add(status_history)
+        db.flush()
+        add_outbox_event(db, service.organization_id, service_event(SERVICE_CREATED, service))
+        crud_service.bump_status_version(db, [service.organization_id])
         db.commit()
         db.refresh(service)
+        invalidate_status_snapshot(service.organization_id)
+        outbox_dispatcher.wake()
         return service
 
     except ValidationError as e:
@@ -63,12 +107,17 @@ def create_service(
 
 @router.get("/", response_model=List[schemas.Service])
 def read_services(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
 ):
-    """Retrieve services."""
-    services = db.query(Service).offset(skip).limit(limit).all()
+    """Retrieve services, newest first."""
+    services = paginate(
+        db.query(Service), Service, response,
+        limit=limit, skip=skip, cursor=cursor
+    )
     return services
 
 @router.get("/{service_id}", response_model=schemas.Service)
@@ -93,20 +142,35 @@ def update_service(
     service_id: str,
     service_in: schemas.ServiceUpdate,
 ):
-    """Update service."""
-    service = db.query(Service).filter(Service.id == service_id).first()
+    """
+    Update service.
+
+    A status change goes through the same path as PUT /{service_id}/status,
+    so it is recorded in the history and uptime rollups.
+    """
+    # Locked so a status change cannot race update_service_status
+    service = db.query(Service).filter(Service.id == service_id).with_for_update().first()
     if not service:
         raise HTTPException(
             status_code=404,
             detail="Service not found"
         )
     
-    for field, value in service_in.dict(exclude_unset=True).items():
+    changes = service_in.dict(exclude_unset=True)
+    new_status = changes.pop("status", None)
+    for field, value in changes.items():
         setattr(service, field, value)
+    if new_status is not None and new_status.value != service.status:
+        _change_status(db, service, new_status.value, None)
     
     db.add(service)
+    db.flush()
+    add_outbox_event(db, service.organization_id, service_event(SERVICE_UPDATED, service))
+    crud_service.bump_status_version(db, [service.organization_id])
     db.commit()
     db.refresh(service)
+    invalidate_status_snapshot(service.organization_id)
+    outbox_dispatcher.wake()
     return service
 
 @router.delete("/{service_id}")
@@ -125,41 +189,61 @@ def delete_service(
             detail="Service not found"
         )
     
+    organization_id = service.organization_id
+    add_outbox_event(db, organization_id, service_event(SERVICE_DELETED, service))
     db.delete(service)
+    crud_service.bump_status_version(db, [organization_id])
     db.commit()
+    invalidate_status_snapshot(organization_id)
+    outbox_dispatcher.wake()
     return {"message": "Service deleted successfully"}
 
 @router.get("/organization/{organization_id}", response_model=List[schemas.Service])
 def read_organization_services(
     *,
+    response: Response,
     db: Session = Depends(deps.get_db),
     organization_id: str,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
 ):
     """
     Get services for a specific organization.
     """
-    services = (
-        db.query(Service)
-        .filter(Service.organization_id == organization_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    services = paginate(
+        db.query(Service).filter(Service.organization_id == organization_id),
+        Service, response,
+        limit=limit, skip=skip, cursor=cursor
     )
     return services
 
 @router.get("/{service_id}/history", response_model=schemas.ServiceWithHistory)
 def read_service_with_history(
     *,
+    response: Response,
     db: Session = Depends(deps.get_db),
-    service_id: str,
+    service_id: UUID,
+    history_limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
 ):
-    """Get service with its status history."""
-    service = db.query(Service).filter(Service.id == service_id).first()
+    """
+    Get service with its latest status changes, newest first.
+
+    Older entries are fetched by passing the X-Next-Cursor header value
+    back as cursor.
+    """
+    service, history, next_cursor = crud_service.get_service_with_history(
+        db, service_id, history_limit, cursor
+    )
     if not service:
         raise NotFoundError("Service", service_id)
-    return service
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return schemas.ServiceWithHistory(
+        **schemas.Service.model_validate(service).model_dump(),
+        status_history=[schemas.ServiceStatusHistoryRead.model_validate(entry) for entry in history]
+    )
 
 @router.put("/{service_id}/status", response_model=schemas.Service)
 def update_service_status(
@@ -170,26 +254,21 @@ def update_service_status(
 ):
     """Update service status with history."""
     try:
-        service = db.query(Service).filter(Service.id == service_id).first()
+        # Locked so concurrent changes cannot both fold the same interval into the rollups
+        service = db.query(Service).filter(Service.id == service_id).with_for_update().first()
         if not service:
             raise NotFoundError("Service", service_id)
 
         if service.status == status_update.status:
             raise ValidationError("Service is already in this status")
 
-        # Record status change
-        status_change = ServiceStatusHistory(
-            service_id=service.id,
-            old_status=service.status,
-            new_status=status_update.status,
-            notes=status_update.notes
-        )
-
-        service.status = status_update.status
+        _change_status(db, service, status_update.status.value, status_update.notes)
         db.add(service)
-        db.add(status_change)
+        crud_service.bump_status_version(db, [service.organization_id])
         db.commit()
         db.refresh(service)
+        invalidate_status_snapshot(service.organization_id)
+        outbox_dispatcher.wake()
 
         return service
 
@@ -202,76 +281,193 @@ def update_service_status(
             detail=str(e)
         )
 
-@router.get("/organization/{organization_id}/status", response_model=List[schemas.ServiceStatus])
-def get_organization_service_statuses(
-    *,
-    db: Session = Depends(deps.get_db),
-    organization_id: str,
-):
-    """Get current status of all services in an organization."""
-    services = (
-        db.query(Service)
-        .filter(Service.organization_id == organization_id)
-        .all()
-    )
-    return [
-        {
-            "id": str(service.id),
-            "name": service.name,
-            "status": service.status,
-            "updated_at": service.updated_at
-        }
-        for service in services
-    ]
-
 @router.get("/{service_id}/status/history", response_model=List[schemas.ServiceStatusHistoryRead])
 def get_service_status_history(
     *,
+    response: Response,
     db: Session = Depends(deps.get_db),
     service_id: str,
-    limit: int = 10
+    limit: int = Query(10, ge=1, le=500),
+    cursor: Optional[str] = None,
 ):
     """Get status change history for a service."""
-    history = (
-        db.query(ServiceStatusHistory)
-        .filter(ServiceStatusHistory.service_id == service_id)
-        .order_by(ServiceStatusHistory.created_at.desc())
-        .limit(limit)
-        .all()
+    history = paginate(
+        db.query(ServiceStatusHistory).filter(ServiceStatusHistory.service_id == service_id),
+        ServiceStatusHistory, response,
+        limit=limit, cursor=cursor
     )
-    return history 
+    return history
+
+@router.post("/status/bulk", response_model=List[schemas.Service])
+def bulk_update_service_status(
+    *,
+    db: Session = Depends(deps.get_db),
+    bulk_update: schemas.ServiceStatusBulkUpdate,
+):
+    """
+    Update the status of many services in one transaction.
+
+    All services are loaded and locked with a single query, the history rows
+    are written with one bulk INSERT and the statuses with one UPDATE.
+    Entries whose service is already in the requested status are left
+    untouched, so retrying a partially applied batch is safe.
+    """
+    try:
+        updates = {item.service_id: item for item in bulk_update.updates}
+        if len(updates) != len(bulk_update.updates):
+            raise ValidationError("Each service may only appear once per batch")
+
+        # Lock in id order so overlapping batches cannot deadlock
+        services = (
+            db.query(Service)
+            .filter(Service.id.in_(updates))
+            .order_by(Service.id)
+            .with_for_update()
+            .all()
+        )
+        missing = set(updates) - {service.id for service in services}
+        if missing:
+            raise NotFoundError("Service", ", ".join(sorted(str(id) for id in missing)))
 
+        changed = [
+            service for service in services
+            if service.status != updates[service.id].status.value
+        ]
+        if changed:
+            crud_uptime.record_transitions(
+                db,
+                {
+                    service.id: (service.status, updates[service.id].status.value)
+                    for service in changed
+                }
+            )
+            db.execute(
+                insert(ServiceStatusHistory),
+                [
+                    {
+                        "service_id": service.id,
+                        "old_status": service.status,
+                        "new_status": updates[service.id].status.value,
+                        "notes": updates[service.id].notes,
+                    }
+                    for service in changed
+                ]
+            )
+            db.execute(
+                update(Service)
+                .where(Service.id.in_([service.id for service in changed]))
+                .values(status=case(
+                    {service.id: updates[service.id].status.value for service in changed},
+                    value=Service.id
+                ))
+                .execution_options(synchronize_session=False)
+            )
+            changed_at = db.scalar(select(func.now()))
+            for service in changed:
+                add_outbox_event(db, service.organization_id, service_status_event(
+                    service,
+                    service.status,
+                    updates[service.id].status.value,
+                    updates[service.id].notes,
+                    changed_at,
+                ))
+        organization_ids = {service.organization_id for service in changed}
+        crud_service.bump_status_version(db, organization_ids)
+        db.commit()
+
+        for organization_id in organization_ids:
+            invalidate_status_snapshot(organization_id)
+        if changed:
+            outbox_dispatcher.wake()
+
+        return (
+            db.query(Service)
+            .filter(Service.id.in_(updates))
+            .order_by(Service.name)
+            .populate_existing()
+            .all()
+        )
+
+    except (NotFoundError, ValidationError):
+        raise
+    except Exception as e:
+        db.rollback()
+        raise APIError(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+BUCKET_WIDTHS = {
+    schemas.StatusBucket.HOUR: timedelta(hours=1),
+    schemas.StatusBucket.DAY: timedelta(days=1),
+    schemas.StatusBucket.WEEK: timedelta(weeks=1),
+}
+MAX_TIMELINE_BUCKETS = 5000
+
+@router.get("/{service_id}/status/timeline", response_model=schemas.ServiceStatusTimeline)
+def get_service_status_timeline(
+    *,
+    db: Session = Depends(deps.get_db),
+    service_id: UUID,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    bucket: schemas.StatusBucket = schemas.StatusBucket.HOUR,
+):
+    """
+    Get the status of a service over time in fixed-size buckets.
+
+    Bucketing happens in the database, so the response size depends only on
+    the window and bucket width, not on how often the service flapped.
+    Defaults to the last 7 days.
+    """
+    if not db.query(Service.id).filter(Service.id == service_id).first():
+        raise NotFoundError("Service", service_id)
+
+    width = BUCKET_WIDTHS[bucket]
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=7)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start >= end:
+        raise ValidationError("'from' must be before 'to'")
+
+    start = crud_uptime.align_to_bucket(start, width)
+    aligned_end = crud_uptime.align_to_bucket(end, width)
+    end = aligned_end if aligned_end == end else aligned_end + width
+    if (end - start) / width > MAX_TIMELINE_BUCKETS:
+        raise ValidationError(
+            f"Window spans more than {MAX_TIMELINE_BUCKETS} buckets, use a larger bucket"
+        )
+
+    return {
+        "service_id": service_id,
+        "bucket": bucket,
+        "start": start,
+        "end": end,
+        "buckets": crud_uptime.get_status_timeline(db, service_id, start, end, width),
+    }
+
+@router.get("/organization/{organization_id}/status", response_model=schemas.ServiceStatusSummary)
 @router.get("/organization/{organization_id}/status/summary", response_model=schemas.ServiceStatusSummary)
 def get_organization_status_summary(
     *,
+    request: Request,
     db: Session = Depends(deps.get_db),
-    organization_id: str,
+    organization_id: UUID,
+    include_services: bool = True,
 ):
-    """Get a summary of service statuses in an organization."""
-    services = (
-        db.query(Service)
-        .filter(Service.organization_id == organization_id)
-        .all()
-    )
-    
-    status_counts = {
-        ServiceStatus.OPERATIONAL: 0,
-        ServiceStatus.DEGRADED: 0,
-        ServiceStatus.PARTIAL_OUTAGE: 0,
-        ServiceStatus.MAJOR_OUTAGE: 0
-    }
-    
-    for service in services:
-        status_counts[service.status] += 1
-    
-    return {
-        "total_services": len(services),
-        "operational_count": status_counts[ServiceStatus.OPERATIONAL],
-        "degraded_count": status_counts[ServiceStatus.DEGRADED],
-        "partial_outage_count": status_counts[ServiceStatus.PARTIAL_OUTAGE],
-        "major_outage_count": status_counts[ServiceStatus.MAJOR_OUTAGE],
-        "services": services
-    } 
+    """
+    Get a summary of service statuses in an organization.
+
+    Counts are computed with a single GROUP BY; the service list is only
+    loaded when include_services is set. Served from a pre-serialized
+    snapshot that is rebuilt only after the organization's services change;
+    clients revalidate with If-None-Match.
+    """
+    snapshot = get_status_snapshot(db, organization_id, include_services)
+    return snapshot_response(request, snapshot)
 
 @router.get("/organization/{organization_id}/services", response_model=List[schemas.Service])
 def get_organization_services(
@@ -286,25 +482,15 @@ def get_organization_services(
     )
     return services
 
-@router.get("/organization/{organization_id}/status", response_model=schemas.ServiceStatusSummary)
-def get_organization_service_status(
+@router.get("/organization/{organization_id}/uptime", response_model=schemas.OrganizationUptime)
+def get_organization_uptime(
+    *,
+    db: Session = Depends(deps.get_db),
     organization_id: UUID,
-    db: Session = Depends(deps.get_db)
+    days: int = Query(90, ge=1, le=settings.UPTIME_ROLLUP_MAX_DAYS),
 ):
-    """Get service status summary for an organization"""
-    services = (
-        db.query(Service)
-        .filter(Service.organization_id == organization_id)
-        .all()
-    )
-    
-    summary = {
-        "total_services": len(services),
-        "operational_count": sum(1 for s in services if s.status == ServiceStatus.OPERATIONAL),
-        "degraded_count": sum(1 for s in services if s.status == ServiceStatus.DEGRADED),
-        "partial_outage_count": sum(1 for s in services if s.status == ServiceStatus.PARTIAL_OUTAGE),
-        "major_outage_count": sum(1 for s in services if s.status == ServiceStatus.MAJOR_OUTAGE),
-        "services": services
-    }
-    
-    return summary 
\ No newline at end of file
+    """
+    Get the daily uptime series and overall uptime of every service in an
+    organization, read from the precomputed daily rollups.
+    """
+    return crud_uptime.get_organization_uptime(db, organization_id, days)
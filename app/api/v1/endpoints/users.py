@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.api import deps
 from app.schemas import user as schemas
 from app.models.user import User
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
+from app.core.pagination import paginate
 import uuid
 from uuid import UUID
 from pydantic import BaseModel
@@ -12,14 +15,14 @@ from pydantic import BaseModel
 router = APIRouter()
 
 @router.post("/", response_model=schemas.User)
-def create_user(
+async def create_user(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     user_in: schemas.UserCreate,
 ):
-    """Create new user."""
+    """Create new user. The password is hashed on the hashing pool."""
     # Check if user with this email exists
-    if db.query(User).filter(User.email == user_in.email).first():
+    if await db.scalar(select(User.id).where(User.email == user_in.email)):
         raise HTTPException(
             status_code=400,
             detail="User with this email already exists."
@@ -27,27 +30,32 @@ def create_user(
 
     user = User(
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await get_password_hash_async(user_in.password),
         full_name=user_in.full_name,
         organization_id=user_in.organization_id,
         is_active=user_in.is_active,
         is_superuser=user_in.is_superuser
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 @router.get("/", response_model=List[schemas.User])
 def read_users(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
 ):
     """
-    Retrieve users.
+    Retrieve users, newest first.
     """
-    users = db.query(User).offset(skip).limit(limit).all()
+    users = paginate(
+        db.query(User), User, response,
+        limit=limit, skip=skip, cursor=cursor
+    )
     return users
 
 @router.get("/{user_id}", response_model=schemas.User)
@@ -68,16 +76,16 @@ def read_user(
     return user
 
 @router.put("/{user_id}", response_model=schemas.User)
-def update_user(
+async def update_user(
     *,
-    db: Session = Depends(deps.get_db),
-    user_id: str,
+    db: AsyncSession = Depends(deps.get_async_db),
+    user_id: UUID,
     user_in: schemas.UserUpdate,
 ):
     """
-    Update user.
+    Update user. A new password is hashed on the hashing pool.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=404,
@@ -87,31 +95,33 @@ def update_user(
     update_data = user_in.dict(exclude_unset=True)
     
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await get_password_hash_async(update_data.pop("password"))
     
     for field, value in update_data.items():
         setattr(user, field, value)
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 @router.get("/organization/{organization_id}", response_model=List[schemas.User])
 def read_organization_users(
     organization_id: str,
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
 ):
     """
     Retrieve users for a specific organization.
     """
-    users = db.query(User)\
-        .filter(User.organization_id == organization_id)\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    users = paginate(
+        db.query(User).filter(User.organization_id == organization_id),
+        User, response,
+        limit=limit, skip=skip, cursor=cursor
+    )
     return users
 
 @router.delete("/{user_id}")
@@ -139,15 +149,15 @@ class TestUserCreate(BaseModel):
     organization_id: UUID
 
 @router.post("/test-user", response_model=schemas.User)
-def create_test_user(
+async def create_test_user(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     user_in: TestUserCreate  # Changed to use request body
 ):
     """Create a test user for development"""
     try:
         # Check if test user exists
-        test_user = db.query(User).filter(User.email == "test@example.com").first()
+        test_user = await db.scalar(select(User).where(User.email == "test@example.com"))
         if test_user:
             return test_user
 
@@ -156,19 +166,19 @@ def create_test_user(
             id=uuid.uuid4(),
             email="test@example.com",
             full_name="Test User",
-            hashed_password=get_password_hash("testpassword"),
+            hashed_password=await get_password_hash_async("testpassword"),
             organization_id=user_in.organization_id,
             is_active=True,
             is_superuser=True
         )
         
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
 
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error creating test user: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1,71 +1,596 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Dict, List
-import logging
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+import asyncio
 import json
+import logging
+import time
 from starlette.websockets import WebSocketState
+from app.api import deps
+from app.core.config import settings
+from app.core.broadcast import BroadcastBackend, create_broadcast_backend, encode_message
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Sent in place of dropped messages when a client falls behind; the client
+# should refetch the current state instead of relying on missed events.
+RESYNC_FRAME = encode_message({"type": "RESYNC"})
+
+# Close code for clients that keep falling behind (1013: try again later)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# Close code for clients that stopped answering heartbeats (1001: going away)
+IDLE_CLOSE_CODE = 1001
+
+# Sent by the server on every heartbeat; clients answer with any message
+PING_FRAME = encode_message({"type": "PING"})
+
+# Upper bound on the services and incidents one client may subscribe to
+MAX_SUBSCRIPTION_TOPICS = 100
+
+def service_topic(service_id) -> str:
+    return f"service:{service_id}"
+
+def incident_topic(incident_id) -> str:
+    return f"incident:{incident_id}"
+
+def message_topics(message: dict) -> Set[str]:
+    """
+    Services and incidents an event is about. Events without any, such as
+    RESYNC, concern every subscriber of the organization; a BATCH concerns
+    everyone interested in any of its events.
+    """
+    if message.get("type") == "BATCH":
+        topics: Set[str] = set()
+        for event in message.get("events", []):
+            event_topics = message_topics(event)
+            if not event_topics:
+                return set()
+            topics |= event_topics
+        return topics
+
+    data = message.get("data")
+    if not isinstance(data, dict):
+        return set()
+    topics = set()
+    if data.get("service_id"):
+        topics.add(service_topic(data["service_id"]))
+    if data.get("incident_id"):
+        topics.add(incident_topic(data["incident_id"]))
+    event_type = message.get("type", "")
+    if data.get("id"):
+        if event_type.startswith("SERVICE_"):
+            topics.add(service_topic(data["id"]))
+        elif event_type.startswith("INCIDENT_") and not event_type.startswith("INCIDENT_UPDATE_"):
+            topics.add(incident_topic(data["id"]))
+    return topics
+
+def subscription_topics(services: Iterable = (), incidents: Iterable = ()) -> Set[str]:
+    return {service_topic(id) for id in services} | {incident_topic(id) for id in incidents}
+
+def format_sse(data: str, event_id: Optional[str] = None) -> str:
+    """Render a Server-Sent Events message carrying ``data``."""
+    if event_id is None:
+        return f"data: {data}\n\n"
+    return f"id: {event_id}\ndata: {data}\n\n"
+
+class StreamEvent:
+    """A sequenced event, encoded once and rendered once per transport."""
+
+    __slots__ = ("seq", "frame", "event_id", "_sse")
+
+    def __init__(self, seq: int, frame: str, event_id: str):
+        self.seq = seq
+        self.frame = frame
+        self.event_id = event_id
+        self._sse: Optional[str] = None
+
+    @property
+    def sse(self) -> str:
+        if self._sse is None:
+            self._sse = format_sse(self.frame, self.event_id)
+        return self._sse
+
+class Subscriber:
+    """
+    A client of an organization's event stream with its own bounded
+    outbound queue, so a slow client only ever delays itself. The queue
+    holds already rendered frames shared between all recipients; transports
+    decide how an event is rendered and how the queue is drained.
+    """
+
+    resync_frame = RESYNC_FRAME
+    kind = "subscriber"
+
+    def __init__(
+        self,
+        organization_id: str,
+        on_close: Callable[["Subscriber"], None],
+        queue_size: int,
+    ):
+        self.organization_id = organization_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # Services and incidents this subscriber is limited to; empty means all
+        self.topics: Set[str] = set()
+        self.resync_pending = False
+        self.closed = False
+        self._on_close = on_close
+
+    def render(self, event: StreamEvent) -> str:
+        return event.frame
+
+    def render_message(self, frame: str) -> str:
+        """Render an unsequenced control frame such as HELLO."""
+        return frame
+
+    def send_event(self, event: StreamEvent) -> None:
+        self.send(self.render(event))
+
+    def has_room(self, count: int) -> bool:
+        """Whether ``count`` more frames fit in the queue without overflowing it."""
+        return self.queue.maxsize <= 0 or self.queue.qsize() + count <= self.queue.maxsize
+
+    def send(self, frame: str) -> None:
+        """Queue a rendered frame without waiting for the network."""
+        if self.closed:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self._overflow()
+
+    def _overflow(self):
+        if self.resync_pending:
+            # Still behind since the last resync, give up on this client
+            logger.warning(f"Dropping slow {self.kind} client of organization {self.organization_id}")
+            self.close()
+            return
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(self.resync_frame)
+        self.resync_pending = True
+
+    def _sent(self, frame: str):
+        if frame is self.resync_frame:
+            self.resync_pending = False
+
+    def heartbeat(self, now: float, idle_timeout: float) -> bool:
+        """Probe the client; returns False if it was closed for being unresponsive."""
+        return True
+
+    def close(self, code: int = SLOW_CONSUMER_CLOSE_CODE):
+        if self.closed:
+            return
+        self.closed = True
+        self._on_close(self)
+
+class ClientConnection(Subscriber):
+    """A websocket subscriber whose queue is drained by a dedicated writer task."""
+
+    kind = "websocket"
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        organization_id: str,
+        on_close: Callable[[Subscriber], None],
+        queue_size: int,
+    ):
+        super().__init__(organization_id, on_close, queue_size)
+        self.websocket = websocket
+        self.last_seen = time.monotonic()
+        self.close_code = SLOW_CONSUMER_CLOSE_CODE
+        self._writer: Optional[asyncio.Task] = None
+        self._closer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write())
+
+    def touch(self):
+        """Record that the client sent something and is therefore alive."""
+        self.last_seen = time.monotonic()
+
+    def heartbeat(self, now: float, idle_timeout: float) -> bool:
+        if now - self.last_seen > idle_timeout:
+            logger.info(f"Reaping unresponsive websocket client of organization {self.organization_id}")
+            self.close(IDLE_CLOSE_CODE)
+            return False
+        self.send(PING_FRAME)
+        return True
+
+    def close(self, code: int = SLOW_CONSUMER_CLOSE_CODE):
+        if self.closed:
+            return
+        self.close_code = code
+        super().close(code)
+        if self._writer is not None:
+            self._writer.cancel()
+        else:
+            # No writer to close the socket on its way out
+            self._closer = asyncio.get_running_loop().create_task(self._close_socket())
+
+    async def _close_socket(self):
+        if self.websocket.client_state == WebSocketState.CONNECTED:
+            try:
+                await self.websocket.close(code=self.close_code)
+            except Exception:
+                pass
+
+    async def _write(self):
+        try:
+            while True:
+                frame = await self.queue.get()
+                if self.websocket.client_state != WebSocketState.CONNECTED:
+                    break
+                await self.websocket.send_text(frame)
+                self._sent(frame)
+        except asyncio.CancelledError:
+            await self._close_socket()
+            raise
+        except Exception as e:
+            logger.error(f"Error sending websocket message: {e}")
+        finally:
+            self.closed = True
+            self._on_close(self)
+
+def coalesce_key(message: dict) -> object:
+    """
+    Messages with the same key within one coalescing window are merged and
+    only the latest is sent: the same event type about the same entity.
+    Messages without an entity id are never merged.
+    """
+    data = message.get("data")
+    entity_id = data.get("id") if isinstance(data, dict) else None
+    if entity_id is None:
+        return object()
+    return message.get("type"), entity_id
+
+class EventStream:
+    """
+    Sequenced event stream of one organization. Every event gets the next
+    sequence number and its encoded frame is kept in a bounded ring buffer,
+    so reconnecting clients can be sent just the events they missed.
+    """
+
+    def __init__(self, stream_id: str, size: int):
+        self.stream_id = stream_id
+        self.seq = 0
+        self.events: Deque[StreamEvent] = deque(maxlen=size)
+        self.last_active = time.monotonic()
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    def append(self, message: dict) -> StreamEvent:
+        self.touch()
+        self.seq += 1
+        event = StreamEvent(
+            self.seq,
+            encode_message({**message, "seq": self.seq}),
+            f"{self.stream_id}:{self.seq}",
+        )
+        self.events.append(event)
+        return event
+
+    def since(self, seq: int) -> Optional[List[StreamEvent]]:
+        """The events after ``seq``, or None if some are no longer buffered."""
+        if seq > self.seq or seq < 0:
+            return None
+        if seq == self.seq:
+            return []
+        if not self.events or self.events[0].seq > seq + 1:
+            return None
+        return [event for event in self.events if event.seq > seq]
+
 # Store active connections
 class ConnectionManager:
-    def __init__(self):
+    def __init__(
+        self,
+        queue_size: int = settings.WS_SEND_QUEUE_SIZE,
+        backend: Optional[Callable[..., BroadcastBackend]] = None,
+        replay_size: int = settings.WS_REPLAY_BUFFER_SIZE,
+        coalesce_ms: int = settings.BROADCAST_COALESCE_MS,
+        heartbeat_interval: float = settings.WS_HEARTBEAT_INTERVAL_SECONDS,
+        idle_timeout: float = settings.WS_IDLE_TIMEOUT_SECONDS,
+        stream_ttl: float = settings.WS_STREAM_IDLE_TTL_SECONDS,
+    ):
         # Store connections by organization_id
-        self.active_connections: Dict[str, List[WebSocket]] = {}
+        self.active_connections: Dict[str, Set[Subscriber]] = {}
+        # Subscribers receiving every event of an organization, and the
+        # subscribers of each (organization_id, topic) for filtered ones
+        self.unfiltered: Dict[str, Set[Subscriber]] = {}
+        self.topic_index: Dict[Tuple[str, str], Set[Subscriber]] = {}
+        self.queue_size = queue_size
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_timeout = idle_timeout
+        self._heartbeat: Optional[asyncio.Task] = None
+        self.counters = {"connects": 0, "disconnects": 0, "reaped": 0}
+        # Sequence numbers are assigned by each worker, so they are only
+        # meaningful together with the id of the worker's stream
+        self.stream_id = uuid4().hex
+        self.replay_size = replay_size
+        self.streams: Dict[str, EventStream] = {}
+        self.stream_ttl = stream_ttl
+        # Messages waiting for the end of their organization's coalescing window
+        self.coalesce_seconds = coalesce_ms / 1000
+        self._pending: Dict[str, Dict[object, dict]] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+        self.backend = backend(self.deliver) if backend else create_broadcast_backend(self.deliver)
+
+    async def start(self):
+        await self.backend.start()
+        if self.heartbeat_interval > 0:
+            self._heartbeat = asyncio.create_task(self._run_heartbeat())
+
+    async def stop(self):
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+        await self.backend.stop()
+        for organization_id in list(self._pending):
+            self._flush(organization_id)
+
+    async def _run_heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                self.heartbeat()
+                self.prune_streams()
+            except Exception as e:
+                logger.error(f"Error during websocket heartbeat: {e}")
+
+    def heartbeat(self) -> int:
+        """Ping every subscriber and reap those idle past the timeout; returns the number reaped."""
+        now = time.monotonic()
+        reaped = 0
+        for connections in list(self.active_connections.values()):
+            for connection in list(connections):
+                if not connection.heartbeat(now, self.idle_timeout):
+                    reaped += 1
+        self.counters["reaped"] += reaped
+        return reaped
+
+    def prune_streams(self) -> int:
+        """
+        Drop the replay buffers of organizations that have had no subscribers
+        and no events for the stream TTL; returns how many were dropped.
+        Clients resuming from a dropped stream are sent a RESYNC.
+        """
+        expired_before = time.monotonic() - self.stream_ttl
+        expired = [
+            organization_id for organization_id, stream in self.streams.items()
+            if organization_id not in self.active_connections and stream.last_active < expired_before
+        ]
+        for organization_id in expired:
+            del self.streams[organization_id]
+        return len(expired)
+
+    def get_stats(self) -> dict:
+        """Subscriber counts of this worker, for monitoring connection churn."""
+        return {
+            **self.counters,
+            "organizations": len(self.active_connections),
+            "subscribers": sum(len(connections) for connections in self.active_connections.values()),
+            "streams": len(self.streams),
+        }
 
-    async def connect(self, websocket: WebSocket, organization_id: str):
+    def get_stream(self, organization_id: str) -> EventStream:
+        if organization_id not in self.streams:
+            self.streams[organization_id] = EventStream(self.stream_id, self.replay_size)
+        return self.streams[organization_id]
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        organization_id: str,
+        since: Optional[int] = None,
+        stream_id: Optional[str] = None,
+    ) -> ClientConnection:
         try:
             await websocket.accept()
-            if organization_id not in self.active_connections:
-                self.active_connections[organization_id] = []
-            self.active_connections[organization_id].append(websocket)
-            logger.info(f"New connection for organization {organization_id}")
+            connection = ClientConnection(websocket, organization_id, self.remove, self.queue_size)
+            connection.start()
+            self.subscribe(connection, since=since, stream_id=stream_id)
+            return connection
         except Exception as e:
             logger.error(f"Error connecting websocket: {e}")
             raise
 
-    def disconnect(self, websocket: WebSocket, organization_id: str):
+    def subscribe(
+        self,
+        subscriber: Subscriber,
+        since: Optional[int] = None,
+        stream_id: Optional[str] = None,
+    ) -> None:
+        """
+        Register a subscriber of any transport. It is first sent a HELLO
+        frame with the current stream id and sequence number; when resuming
+        with ``since`` and the matching ``stream_id`` the missed events are
+        replayed after it. A RESYNC is sent instead if they are no longer
+        known or would not fit in the subscriber's queue.
+
+        The subscriber is registered before anything is queued, so closing
+        it for overflowing also unregisters it.
+        """
+        organization_id = subscriber.organization_id
+        stream = self.get_stream(organization_id)
+        if organization_id not in self.active_connections:
+            self.active_connections[organization_id] = set()
+        self.active_connections[organization_id].add(subscriber)
+        self._index(subscriber)
+        self.counters["connects"] += 1
+        logger.info(f"New {subscriber.kind} subscriber for organization {organization_id}")
+
+        subscriber.send(subscriber.render_message(
+            encode_message({"type": "HELLO", "stream": self.stream_id, "seq": stream.seq})
+        ))
+        if since is not None:
+            missed = stream.since(since) if stream_id == self.stream_id else None
+            if missed is None or not subscriber.has_room(len(missed)):
+                subscriber.send(subscriber.resync_frame)
+            else:
+                for event in missed:
+                    subscriber.send_event(event)
+
+    def set_topics(self, subscriber: Subscriber, topics: Set[str]) -> None:
+        """Limit a subscriber to events about ``topics``, or lift the limit when empty."""
+        self._unindex(subscriber)
+        subscriber.topics = set(topics)
+        if not subscriber.closed:
+            self._index(subscriber)
+
+    def _index(self, subscriber: Subscriber):
+        organization_id = subscriber.organization_id
+        if not subscriber.topics:
+            self.unfiltered.setdefault(organization_id, set()).add(subscriber)
+        for topic in subscriber.topics:
+            self.topic_index.setdefault((organization_id, topic), set()).add(subscriber)
+
+    def _unindex(self, subscriber: Subscriber):
+        organization_id = subscriber.organization_id
+        keys = [(self.unfiltered, organization_id)]
+        keys += [(self.topic_index, (organization_id, topic)) for topic in subscriber.topics]
+        for index, key in keys:
+            subscribers = index.get(key)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del index[key]
+
+    def recipients(self, organization_id: str, message: dict) -> Set[Subscriber]:
+        topics = message_topics(message)
+        if not topics:
+            return set(self.active_connections.get(organization_id, ()))
+        recipients = set(self.unfiltered.get(organization_id, ()))
+        for topic in topics:
+            recipients.update(self.topic_index.get((organization_id, topic), ()))
+        return recipients
+
+    def disconnect(self, connection: Subscriber):
+        connection.close()
+
+    def remove(self, connection: Subscriber):
         try:
-            if organization_id in self.active_connections:
-                self.active_connections[organization_id].remove(websocket)
-                logger.info(f"Connection removed for organization {organization_id}")
+            connections = self.active_connections.get(connection.organization_id)
+            if connections and connection in connections:
+                connections.discard(connection)
+                self._unindex(connection)
+                if not connections:
+                    del self.active_connections[connection.organization_id]
+                    # Keep the replay buffer for a full TTL after the last client left
+                    stream = self.streams.get(connection.organization_id)
+                    if stream is not None:
+                        stream.touch()
+                self.counters["disconnects"] += 1
+                logger.info(f"Connection removed for organization {connection.organization_id}")
         except Exception as e:
             logger.error(f"Error disconnecting websocket: {e}")
 
     async def broadcast_to_organization(self, organization_id: str, message: dict):
-        if organization_id not in self.active_connections:
+        """Publish ``message`` to the subscribers of the organization on every worker."""
+        await self.backend.publish(organization_id, message)
+
+    def deliver(self, organization_id: str, message: dict):
+        """
+        Queue ``message`` for this worker's subscribers; never waits on a
+        socket. With coalescing enabled, messages are held for the
+        organization's window and sent together when it ends.
+        """
+        if not self.coalesce_seconds:
+            self._dispatch(organization_id, message)
             return
-        
-        disconnected = []
-        for connection in self.active_connections[organization_id]:
-            try:
-                if connection.client_state == WebSocketState.CONNECTED:
-                    await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting message: {e}")
-                disconnected.append(connection)
+        pending = self._pending.get(organization_id)
+        if pending is None:
+            pending = self._pending[organization_id] = {}
+            self._flush_handles[organization_id] = asyncio.get_running_loop().call_later(
+                self.coalesce_seconds, self._flush, organization_id
+            )
+        # Replacing an existing key keeps its position, so the batch stays
+        # ordered by when each entity first changed
+        pending[coalesce_key(message)] = message
 
-        # Clean up disconnected connections
-        for connection in disconnected:
-            try:
-                self.active_connections[organization_id].remove(connection)
-            except ValueError:
-                pass
+    def _flush(self, organization_id: str):
+        handle = self._flush_handles.pop(organization_id, None)
+        if handle is not None:
+            handle.cancel()
+        messages = list(self._pending.pop(organization_id, {}).values())
+        if len(messages) == 1:
+            self._dispatch(organization_id, messages[0])
+        elif messages:
+            self._dispatch(organization_id, {"type": "BATCH", "events": messages})
+
+    def _dispatch(self, organization_id: str, message: dict):
+        """Sequence and encode ``message`` once and share its frames with every interested subscriber."""
+        event = self.get_stream(organization_id).append(message)
+        for connection in self.recipients(organization_id, message):
+            connection.send_event(event)
 
 manager = ConnectionManager()
 
+def handle_client_message(connection: ClientConnection, data: str):
+    try:
+        message = json.loads(data)
+    except ValueError:
+        connection.send(encode_message({"type": "ERROR", "detail": "Invalid JSON"}))
+        return
+    if not isinstance(message, dict) or message.get("type") != "SUBSCRIBE":
+        connection.send(encode_message({"type": "ERROR", "detail": "Unknown message type"}))
+        return
+
+    services = message.get("services") or []
+    incidents = message.get("incidents") or []
+    if not isinstance(services, list) or not isinstance(incidents, list):
+        connection.send(encode_message({"type": "ERROR", "detail": "services and incidents must be lists"}))
+        return
+    topics = subscription_topics(map(str, services), map(str, incidents))
+    if len(topics) > MAX_SUBSCRIPTION_TOPICS:
+        connection.send(encode_message({
+            "type": "ERROR",
+            "detail": f"At most {MAX_SUBSCRIPTION_TOPICS} services and incidents can be subscribed to",
+        }))
+        return
+    manager.set_topics(connection, topics)
+    connection.send(encode_message({"type": "SUBSCRIBED", "services": services, "incidents": incidents}))
+
 @router.websocket("/ws/{organization_id}")
-async def websocket_endpoint(websocket: WebSocket, organization_id: str):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    organization_id: UUID,
+    since: Optional[int] = None,
+    stream: Optional[str] = None,
+):
+    """
+    Organization event stream. Every event carries a ``seq``; to resume after
+    a disconnect reconnect with ``?since=<last seq>&stream=<HELLO stream id>``.
+    The server sends PING frames and closes clients that send nothing back
+    within the idle timeout.
+
+    Clients interested in a few services or incidents only can send
+    ``{"type": "SUBSCRIBE", "services": [...], "incidents": [...]}``; an
+    empty subscription receives everything again. Replays are not filtered.
+    """
+    if not await deps.organization_exists(organization_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    connection = None
     try:
-        await manager.connect(websocket, organization_id)
+        connection = await manager.connect(websocket, str(organization_id), since=since, stream_id=stream)
         while True:
             try:
-                # Keep connection alive with ping/pong
+                # Any message counts as a heartbeat; "ping" is still answered
                 data = await websocket.receive_text()
+                connection.touch()
                 if data == "ping":
-                    await websocket.send_text("pong")
+                    connection.send("pong")
+                elif data.startswith("{"):
+                    handle_client_message(connection, data)
             except WebSocketDisconnect:
-                manager.disconnect(websocket, organization_id)
                 break
             except Exception as e:
                 logger.error(f"WebSocket error: {e}")
@@ -73,4 +598,5 @@ async def websocket_endpoint(websocket: WebSocket, organization_id: str):
     except Exception as e:
         logger.error(f"WebSocket connection error: {e}")
     finally:
-        manager.disconnect(websocket, organization_id) 
\ No newline at end of file
+        if connection is not None:
+            manager.disconnect(connection)
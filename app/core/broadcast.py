@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+from typing import Callable, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[str, dict], None]
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+def encode_message(message: dict) -> str:
+    """Serialize an event to the JSON text frame sent to clients, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(message, default=str).decode()
+    return json.dumps(message, separators=(",", ":"), default=str)
+
+class BroadcastBackend:
+    """
+    Carries organization events to every worker. ``publish`` may be called
+    on any worker; ``deliver`` is then invoked on all of them (including
+    the publisher) to push the event to their local subscribers.
+    """
+
+    def __init__(self, deliver: Deliver):
+        self.deliver = deliver
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, organization_id: str, message: dict) -> None:
+        raise NotImplementedError
+
+class MemoryBroadcastBackend(BroadcastBackend):
+    """Delivers within the current process only; for single-worker setups and tests."""
+
+    async def publish(self, organization_id: str, message: dict) -> None:
+        self.deliver(organization_id, message)
+
+class PostgresBroadcastBackend(BroadcastBackend):
+    """
+    Fans events out through Postgres LISTEN/NOTIFY, so every worker on
+    every host sharing the database receives them. Each worker keeps one
+    dedicated listening connection and reconnects if it drops; publishing
+    goes through the regular async engine pool.
+    """
+
+    CHANNEL = "status_page_events"
+    # NOTIFY payloads must stay below 8000 bytes
+    MAX_PAYLOAD_BYTES = 7900
+    RECONNECT_DELAY_SECONDS = 1.0
+
+    def __init__(self, deliver: Deliver, dsn: Optional[str] = None):
+        super().__init__(deliver)
+        self.dsn = dsn
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def publish(self, organization_id: str, message: dict) -> None:
+        from app.db.session import async_engine
+
+        payload = encode_message({"organization_id": organization_id, "message": message})
+        if len(payload.encode()) > self.MAX_PAYLOAD_BYTES:
+            logger.warning(f"Event for organization {organization_id} too large to NOTIFY, sending resync")
+            payload = encode_message({"organization_id": organization_id, "message": {"type": "RESYNC"}})
+        async with async_engine.connect() as connection:
+            await connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.CHANNEL, "payload": payload}
+            )
+            await connection.commit()
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            event = json.loads(payload)
+            self.deliver(event["organization_id"], event["message"])
+        except Exception as e:
+            logger.error(f"Error delivering broadcast notification: {e}")
+
+    async def _listen(self):
+        import asyncpg
+        from app.db.session import get_async_database_url
+
+        dsn = self.dsn or make_url(get_async_database_url()).set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(self.CHANNEL, self._on_notification)
+                logger.info(f"Listening for broadcasts on channel {self.CHANNEL}")
+                await lost.wait()
+                logger.warning("Broadcast listener connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Broadcast listener error: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.RECONNECT_DELAY_SECONDS)
+
+BACKENDS = {
+    "memory": MemoryBroadcastBackend,
+    "postgres": PostgresBroadcastBackend,
+}
+
+def create_broadcast_backend(deliver: Deliver, name: Optional[str] = None) -> BroadcastBackend:
+    name = name or settings.BROADCAST_BACKEND
+    try:
+        return BACKENDS[name](deliver)
+    except KeyError:
+        raise ValueError(f"Unknown broadcast backend {name!r}, expected one of {sorted(BACKENDS)}")
@@ -0,0 +1,112 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class OrganizationCache:
+    """Process-local cache of values scoped to an organization.
+
+    Every organization carries a version counter that is bumped by
+    ``invalidate``. A value built while an invalidation happened is never
+    stored, so readers cannot resurrect stale data. Entries also expire
+    after ``ttl`` seconds, which bounds staleness on workers that did not
+    see the invalidation.
+
+    Keys often come from request parameters, so the cache is bounded:
+    expired entries are dropped as they are found, an organization keeps at
+    most ``max_entries_per_organization`` entries and the whole cache at
+    most ``max_entries``, evicting the oldest first.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: Optional[int] = None,
+        max_entries_per_organization: Optional[int] = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_entries_per_organization = max_entries_per_organization
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        # Insertion ordered, and every entry lives for the same ttl, so the
+        # first entries are always the first to expire
+        self._entries: Dict[Tuple[str, Hashable], Tuple[float, Any]] = {}
+        self._counts: Dict[str, int] = {}
+
+    def get(self, organization_id: Any, key: Hashable = None) -> Optional[Any]:
+        entry_key = (str(organization_id), key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                self._remove(entry_key)
+                return None
+        return value
+
+    def get_or_build(
+        self,
+        organization_id: Any,
+        builder: Callable[[], Any],
+        key: Hashable = None,
+    ) -> Any:
+        """Return the cached value, building and storing it on a miss."""
+        value = self.get(organization_id, key)
+        if value is not None:
+            return value
+
+        organization_id = str(organization_id)
+        with self._lock:
+            version = self._versions.get(organization_id, 0)
+        value = builder()
+        with self._lock:
+            if self._versions.get(organization_id, 0) == version:
+                self._store((organization_id, key), value)
+        return value
+
+    def invalidate(self, organization_id: Any) -> None:
+        organization_id = str(organization_id)
+        with self._lock:
+            self._versions[organization_id] = self._versions.get(organization_id, 0) + 1
+            if organization_id in self._counts:
+                for entry_key in [entry_key for entry_key in self._entries if entry_key[0] == organization_id]:
+                    self._remove(entry_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for organization_id in self._counts:
+                self._versions[organization_id] = self._versions.get(organization_id, 0) + 1
+            self._entries.clear()
+            self._counts.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, entry_key: Tuple[str, Hashable], value: Any) -> None:
+        now = time.monotonic()
+        self._remove(entry_key)
+        while self._entries:
+            oldest = next(iter(self._entries))
+            if self._entries[oldest][0] >= now:
+                break
+            self._remove(oldest)
+
+        organization_id = entry_key[0]
+        limit = self.max_entries_per_organization
+        if limit and self._counts.get(organization_id, 0) >= limit:
+            self._remove(next(key for key in self._entries if key[0] == organization_id))
+        if self.max_entries and len(self._entries) >= self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+        self._entries[entry_key] = (now + self.ttl, value)
+        self._counts[organization_id] = self._counts.get(organization_id, 0) + 1
+
+    def _remove(self, entry_key: Tuple[str, Hashable]) -> None:
+        if self._entries.pop(entry_key, None) is None:
+            return
+        organization_id = entry_key[0]
+        self._counts[organization_id] -= 1
+        if not self._counts[organization_id]:
+            del self._counts[organization_id]
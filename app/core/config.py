@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 import os
 import json
@@ -9,9 +9,20 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Status Page"
     VERSION: str = "1.0.0"
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-super-secret-key-for-development")
+    # Shared secret for the /internal endpoints, sent as X-Internal-Token;
+    # they answer 404 while it is unset
+    INTERNAL_API_TOKEN: Optional[str] = None
     
     # Database Settings
     DATABASE_URL: str
+    # Defaults to DATABASE_URL with the asyncpg driver
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Connection pool, applied per engine (sync and async) in every worker
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_ECHO: bool = False
     
     # CORS Settings
     BACKEND_CORS_ORIGINS: List[str] = json.loads(
@@ -19,6 +30,58 @@ class Settings(BaseSettings):
     )
     
     VITE_API_URL: str
+
+    # Password Hashing Settings
+    # bcrypt cost; hashes made with another cost are upgraded on login
+    BCRYPT_ROUNDS: int = 12
+    # Threads verifying and hashing passwords concurrently per worker
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Cache Settings
+    # Status snapshots are revalidated against the database on every
+    # request; the TTL only drops snapshots of idle organizations
+    STATUS_SNAPSHOT_TTL_SECONDS: int = 30
+    # Upper bound on how long a worker may serve incident metrics that
+    # another worker has invalidated
+    INCIDENT_METRICS_TTL_SECONDS: int = 300
+    # Entries kept per worker; organization ids and metrics windows come
+    # from requests, so both caches are bounded
+    STATUS_SNAPSHOT_MAX_ENTRIES: int = 10000
+    INCIDENT_METRICS_MAX_ENTRIES: int = 2000
+    # Metrics windows cached per organization before the oldest is evicted
+    INCIDENT_METRICS_MAX_ENTRIES_PER_ORGANIZATION: int = 20
+
+    # Realtime Settings
+    # "memory" reaches only this worker, "postgres" fans out with LISTEN/NOTIFY
+    BROADCAST_BACKEND: str = "memory"
+    # Outbound messages buffered per websocket before the client is asked to resync
+    WS_SEND_QUEUE_SIZE: int = 256
+    # Recent events kept per organization for replay on reconnect
+    WS_REPLAY_BUFFER_SIZE: int = 1000
+    # Replay buffers of organizations without subscribers or events are dropped after this
+    WS_STREAM_IDLE_TTL_SECONDS: float = 600.0
+    # Websockets are pinged every interval and closed after the timeout without a reply
+    WS_HEARTBEAT_INTERVAL_SECONDS: float = 25.0
+    WS_IDLE_TIMEOUT_SECONDS: float = 60.0
+    # Window in which bursts of events are merged into one frame; 0 disables it
+    BROADCAST_COALESCE_MS: int = 0
+    # Idle time after which event streams send a keepalive comment
+    SSE_KEEPALIVE_SECONDS: float = 15.0
+    # Outbox rows published per batch, and how often to look for new ones
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+
+    # Uptime Settings
+    # How far back a single transition is spread over the daily rollups,
+    # and the longest window the uptime endpoint serves
+    UPTIME_ROLLUP_MAX_DAYS: int = 365
+
+    # Status History Partitioning
+    # Monthly partitions older than this are detached (archive) or dropped;
+    # keep it longer than UPTIME_ROLLUP_MAX_DAYS. 0 keeps everything.
+    STATUS_HISTORY_RETENTION_MONTHS: int = 24
+    STATUS_HISTORY_ARCHIVE: bool = True
+    STATUS_HISTORY_PARTITIONS_AHEAD: int = 3
     
     class Config:
         env_file = ".env"
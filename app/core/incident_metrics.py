@@ -0,0 +1,23 @@
+from datetime import datetime
+from sqlalchemy.orm import Session
+from app.core.cache import OrganizationCache
+from app.core.config import settings
+from app.crud import crud_incident
+
+# Rebuilt lazily after the incidents of an organization change
+incident_metrics = OrganizationCache(
+    ttl=settings.INCIDENT_METRICS_TTL_SECONDS,
+    max_entries=settings.INCIDENT_METRICS_MAX_ENTRIES,
+    max_entries_per_organization=settings.INCIDENT_METRICS_MAX_ENTRIES_PER_ORGANIZATION,
+)
+
+def get_incident_metrics(db: Session, organization_id, start: datetime, end: datetime, group_by: str) -> dict:
+    """Return the cached metrics of one window and grouping, querying the database only on a miss."""
+    return incident_metrics.get_or_build(
+        organization_id,
+        lambda: crud_incident.get_incident_metrics(db, organization_id, start, end, group_by),
+        key=(start, end, group_by),
+    )
+
+def invalidate_incident_metrics(organization_id) -> None:
+    incident_metrics.invalidate(organization_id)
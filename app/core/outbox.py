@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+from sqlalchemy import delete, func, select
+from app.core.config import settings
+from app.models.outbox import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+Publish = Callable[[str, dict], Awaitable[None]]
+
+# Advisory lock serializing dispatch across workers ("outbox" in ASCII)
+DISPATCH_LOCK_KEY = 0x6F7574626F78
+
+# How soon to retry when another worker holds the dispatch lock
+BUSY_RETRY_SECONDS = 0.05
+
+def add_outbox_event(db, organization_id, message: dict) -> None:
+    """
+    Queue ``message`` for broadcast to the organization. Works with sync and
+    async sessions; the event is only published once the caller commits.
+    """
+    db.add(OutboxEvent(organization_id=organization_id, payload=message))
+
+class OutboxDispatcher:
+    """
+    Publishes outbox rows in batches, oldest first, and deletes them only
+    after publishing: delivery is at least once. Every worker runs a
+    dispatcher, but each batch is taken under a transaction-level advisory
+    lock, so only one publishes at a time and events leave in id order.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        poll_interval: float = settings.OUTBOX_POLL_INTERVAL_SECONDS,
+    ):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.publish: Optional[Publish] = None
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self, publish: Publish) -> None:
+        self.publish = publish
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+
+    def wake(self) -> None:
+        """
+        Dispatch right away instead of at the next poll, after committing
+        events. Safe to call from sync endpoints running on worker threads.
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            try:
+                dispatched = await self.dispatch_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error dispatching outbox events: {e}")
+                dispatched = 0
+            if dispatched is None:
+                # Another worker is publishing; it may not have seen our events yet
+                await asyncio.sleep(min(BUSY_RETRY_SECONDS, self.poll_interval))
+            elif dispatched < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def dispatch_batch(self) -> Optional[int]:
+        """
+        Publish and remove one batch of pending events; returns how many were
+        sent, or None if another worker is dispatching.
+        """
+        from app.db.session import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            if not await db.scalar(select(func.pg_try_advisory_xact_lock(DISPATCH_LOCK_KEY))):
+                await db.rollback()
+                return None
+            events = (await db.scalars(
+                select(OutboxEvent)
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+            )).all()
+            if not events:
+                return 0
+            try:
+                for event in events:
+                    await self.publish(str(event.organization_id), event.payload)
+            except Exception:
+                await db.rollback()
+                raise
+            await db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_([event.id for event in events])))
+            await db.commit()
+            return len(events)
+
+outbox_dispatcher = OutboxDispatcher()
@@ -0,0 +1,69 @@
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+from fastapi import Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+from app.core.errors import ValidationError
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """Encode a (created_at, id) position as an opaque cursor."""
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(id)
+    except ValueError:
+        raise ValidationError("Invalid cursor")
+
+def encode_ranked_cursor(rank: float, created_at: datetime, id: UUID) -> str:
+    """Encode a (rank, created_at, id) position of relevance-ordered results."""
+    raw = f"{created_at.isoformat()}|{id}|{rank!r}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_ranked_cursor(cursor: str) -> Tuple[float, datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id, rank = base64.urlsafe_b64decode(padded).decode().split("|")
+        return float(rank), datetime.fromisoformat(created_at), UUID(id)
+    except ValueError:
+        raise ValidationError("Invalid cursor")
+
+def paginate(
+    query: Query,
+    model,
+    response: Response,
+    *,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+) -> list:
+    """
+    Page through ``query`` newest first, keyed on (created_at, id).
+
+    With a cursor the page starts right after the given position, which
+    an index on (..., created_at, id) resolves without scanning the rows
+    before it. Without one, ``skip`` falls back to OFFSET paging. When more
+    rows follow, the cursor of the next page is returned in the
+    X-Next-Cursor response header.
+    """
+    if limit < 1:
+        return []
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, id))
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if skip and not cursor:
+        query = query.offset(skip)
+
+    items = query.limit(limit + 1).all()
+    if len(items) > limit:
+        items = items[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(items[-1].created_at, items[-1].id)
+    return items
@@ -0,0 +1,70 @@
+"""Types and payloads of the events published to organization subscribers."""
+from datetime import datetime
+from typing import Optional
+
+INCIDENT_CREATED = "INCIDENT_CREATED"
+INCIDENT_UPDATED = "INCIDENT_UPDATED"
+INCIDENT_UPDATE_POSTED = "INCIDENT_UPDATE_POSTED"
+SERVICE_CREATED = "SERVICE_CREATED"
+SERVICE_UPDATED = "SERVICE_UPDATED"
+SERVICE_DELETED = "SERVICE_DELETED"
+SERVICE_STATUS_CHANGED = "SERVICE_STATUS_CHANGED"
+
+def _isoformat(moment: Optional[datetime]) -> Optional[str]:
+    return moment.isoformat() if moment else None
+
+def incident_event(event_type: str, incident) -> dict:
+    return {
+        "type": event_type,
+        "data": {
+            "id": str(incident.id),
+            "title": incident.title,
+            "description": incident.description,
+            "status": incident.status,
+            "impact": incident.impact,
+            "service_id": str(incident.service_id),
+            "created_at": _isoformat(incident.created_at),
+            "updated_at": _isoformat(incident.updated_at),
+            "resolved_at": _isoformat(incident.resolved_at),
+        }
+    }
+
+def incident_update_event(update, incident) -> dict:
+    return {
+        "type": INCIDENT_UPDATE_POSTED,
+        "data": {
+            "id": str(update.id),
+            "incident_id": str(update.incident_id),
+            "service_id": str(incident.service_id),
+            "message": update.message,
+            "status": update.status,
+            "created_by_id": str(update.created_by_id),
+            "created_at": _isoformat(update.created_at),
+        }
+    }
+
+def service_event(event_type: str, service) -> dict:
+    return {
+        "type": event_type,
+        "data": {
+            "id": str(service.id),
+            "name": service.name,
+            "description": service.description,
+            "status": service.status,
+            "created_at": _isoformat(service.created_at),
+            "updated_at": _isoformat(service.updated_at),
+        }
+    }
+
+def service_status_event(service, old_status: str, new_status: str, notes: Optional[str], changed_at: datetime) -> dict:
+    return {
+        "type": SERVICE_STATUS_CHANGED,
+        "data": {
+            "id": str(service.id),
+            "name": service.name,
+            "old_status": old_status,
+            "status": new_status,
+            "notes": notes,
+            "changed_at": _isoformat(changed_at),
+        }
+    }
@@ -1,6 +1,94 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
 from passlib.context import CryptContext
+from app.core.config import settings
+from app.db.pool_metrics import Histogram
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# Hashes with a different cost than BCRYPT_ROUNDS are reported as needing
+# an update, so they are rehashed on the next successful login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# Upper bounds (seconds) of the hashing time histogram buckets
+HASH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class PasswordHashMetrics:
+    """Durations of password hashing work and time spent waiting for a worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations = Histogram(HASH_BUCKETS)
+        self._wait_sum = 0.0
+        self._rehashes = 0
+        self.in_flight = 0
+        self.waiting = 0
+
+    def record(self, seconds: float, waited: float) -> None:
+        with self._lock:
+            self._durations.observe(seconds)
+            self._wait_sum += waited
+
+    def record_rehash(self) -> None:
+        with self._lock:
+            self._rehashes += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "rounds": settings.BCRYPT_ROUNDS,
+                "workers": settings.PASSWORD_HASH_WORKERS,
+                "operations": self._durations.count,
+                "seconds_total": round(self._durations.sum, 6),
+                "seconds_histogram": self._durations.buckets_snapshot(),
+                "wait_seconds_total": round(self._wait_sum, 6),
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "rehashes": self._rehashes,
+            }
+
+password_hash_metrics = PasswordHashMetrics()
+
+# bcrypt releases the GIL while hashing, so threads run it in parallel
+# without blocking the event loop; the semaphore keeps excess requests
+# waiting on the loop instead of piling up in the executor queue
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+_slots = asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS)
+
+async def _run_hashing(function: Callable[..., T], *args) -> T:
+    metrics = password_hash_metrics
+    queued_at = time.perf_counter()
+    metrics.waiting += 1
+    try:
+        await _slots.acquire()
+    finally:
+        metrics.waiting -= 1
+
+    metrics.in_flight += 1
+    started_at = time.perf_counter()
+
+    def finished(_):
+        # Runs when the thread is done, even if the request was cancelled,
+        # so a slot is never handed out while its work is still running
+        metrics.in_flight -= 1
+        metrics.record(time.perf_counter() - started_at, started_at - queued_at)
+        _slots.release()
+
+    future = asyncio.get_running_loop().run_in_executor(_executor, function, *args)
+    future.add_done_callback(finished)
+    return await asyncio.shield(future)
 
 def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt"""
@@ -8,4 +96,19 @@ def get_password_hash(password: str) -> str:
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password) 
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop."""
+    return await _run_hashing(pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the hashing pool. Returns whether it matched and,
+    if the hash was made with another cost than BCRYPT_ROUNDS, a new hash
+    the caller should store.
+    """
+    valid, new_hash = await _run_hashing(pwd_context.verify_and_update, plain_password, hashed_password)
+    if new_hash:
+        password_hash_metrics.record_rehash()
+    return valid, new_hash
@@ -0,0 +1,68 @@
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import Request, Response, status
+from sqlalchemy.orm import Session
+from app.core.cache import OrganizationCache
+from app.core.config import settings
+from app.crud import crud_service
+from app.schemas.service import ServiceStatusSummary
+
+@dataclass(frozen=True)
+class StatusSnapshot:
+    """Pre-serialized public status summary of one organization."""
+    body: bytes
+    etag: str
+    # Services version of the organization the snapshot was built from
+    version: Optional[int] = None
+
+# Rebuilt lazily after the services of an organization change, on any worker
+status_snapshots = OrganizationCache(
+    ttl=settings.STATUS_SNAPSHOT_TTL_SECONDS,
+    max_entries=settings.STATUS_SNAPSHOT_MAX_ENTRIES,
+)
+
+def build_status_snapshot(db: Session, organization_id, include_services: bool = True, version: Optional[int] = None) -> StatusSnapshot:
+    summary = ServiceStatusSummary.model_validate(
+        crud_service.get_status_summary(db, organization_id, include_services)
+    )
+    body = summary.model_dump_json(exclude_none=not include_services).encode()
+    etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+    return StatusSnapshot(body=body, etag=etag, version=version)
+
+def get_status_snapshot(db: Session, organization_id, include_services: bool = True) -> StatusSnapshot:
+    """
+    Return the cached snapshot, building the summary only on a miss. The
+    cached copy is checked against the organization's services version,
+    one primary key lookup, so changes made through another worker are
+    picked up on the next request. The version is read before the summary:
+    a change committed in between only causes one extra rebuild, never a
+    stale snapshot.
+    """
+    version = crud_service.get_status_version(db, organization_id)
+    snapshot = status_snapshots.get(organization_id, include_services)
+    if snapshot is not None and snapshot.version != version:
+        status_snapshots.invalidate(organization_id)
+    return status_snapshots.get_or_build(
+        organization_id,
+        lambda: build_status_snapshot(db, organization_id, include_services, version),
+        key=include_services,
+    )
+
+def invalidate_status_snapshot(organization_id) -> None:
+    status_snapshots.invalidate(organization_id)
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def snapshot_response(request: Request, snapshot: StatusSnapshot) -> Response:
+    """Serve a snapshot, answering 304 when the client already has it."""
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": "public, no-cache",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
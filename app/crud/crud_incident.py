@@ -0,0 +1,264 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, cast, func, literal, select, true, tuple_, union_all
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlalchemy.orm import Session, aliased, contains_eager
+from app.core.errors import ValidationError
+from app.core.pagination import decode_cursor, decode_ranked_cursor, encode_cursor, encode_ranked_cursor
+from app.models.incident import INCIDENT_TRANSITIONS, SEARCH_CONFIG, Incident, IncidentStatus
+from app.models.incident_update import IncidentUpdate
+from app.models.service import Service
+
+def set_incident_status(incident: Incident, status, resolved_at: Optional[datetime] = None) -> None:
+    """
+    Move an incident to ``status``, keeping resolved_at and is_active in
+    step. Resolving stamps resolved_at with the transaction time unless
+    ``resolved_at`` is given; reopening clears it. Raises ValidationError
+    for transitions the lifecycle does not allow.
+    """
+    status = IncidentStatus(status)
+    current = IncidentStatus(incident.status) if incident.status else None
+    if current is not None and status not in INCIDENT_TRANSITIONS[current]:
+        raise ValidationError(f"Cannot change incident status from {current.value} to {status.value}")
+
+    incident.status = status
+    if status == IncidentStatus.RESOLVED:
+        if resolved_at is not None:
+            incident.resolved_at = resolved_at
+        elif current != IncidentStatus.RESOLVED:
+            incident.resolved_at = func.now()
+        incident.is_active = False
+    else:
+        incident.resolved_at = None
+        incident.is_active = True
+
+def get_incident_timeline(db: Session, incident_id) -> Optional[Incident]:
+    """
+    Load an incident and all of its updates, oldest first, with a single
+    joined query. Returns None if the incident does not exist.
+    """
+    # Not .first(): its LIMIT 1 would cut the joined updates to one row
+    incidents = (
+        db.query(Incident)
+        .outerjoin(Incident.updates)
+        .options(contains_eager(Incident.updates))
+        .filter(Incident.id == incident_id)
+        .order_by(IncidentUpdate.created_at, IncidentUpdate.id)
+        .populate_existing()
+        .all()
+    )
+    return incidents[0] if incidents else None
+
+def get_recent_incidents_with_updates(
+    db: Session,
+    organization_id,
+    limit: int,
+    updates_per_incident: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Tuple[Incident, List[IncidentUpdate]]], Optional[str]]:
+    """
+    Latest ``limit`` incidents of an organization, newest first, each with
+    its latest ``updates_per_incident`` updates, in a single query.
+
+    The page of incidents is resolved first and only the updates of those
+    incidents are ranked with ROW_NUMBER() OVER (PARTITION BY incident_id),
+    so the work does not grow with the total number of updates. Returns
+    (incident, updates) pairs and the cursor of the next page.
+    """
+    page = select(Incident.id).where(Incident.organization_id == organization_id)
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        page = page.where(tuple_(Incident.created_at, Incident.id) < tuple_(created_at, id))
+    page = (
+        page
+        .order_by(Incident.created_at.desc(), Incident.id.desc())
+        .limit(limit + 1)
+        .subquery("page")
+    )
+
+    ranked = (
+        select(
+            IncidentUpdate,
+            func.row_number().over(
+                partition_by=IncidentUpdate.incident_id,
+                order_by=(IncidentUpdate.created_at.desc(), IncidentUpdate.id.desc())
+            ).label("position"),
+        )
+        .where(IncidentUpdate.incident_id.in_(select(page.c.id)))
+        .subquery("ranked")
+    )
+    latest = aliased(IncidentUpdate, ranked)
+
+    rows = db.execute(
+        select(Incident, latest)
+        .join(page, page.c.id == Incident.id)
+        .outerjoin(latest, and_(latest.incident_id == Incident.id, ranked.c.position <= updates_per_incident))
+        .order_by(Incident.created_at.desc(), Incident.id.desc(), ranked.c.position)
+    ).all()
+
+    incidents: "OrderedDict[object, Tuple[Incident, List[IncidentUpdate]]]" = OrderedDict()
+    for incident, update in rows:
+        _, updates = incidents.setdefault(incident.id, (incident, []))
+        if update is not None:
+            updates.append(update)
+
+    results = list(incidents.values())
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        last = results[-1][0]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return results, next_cursor
+
+def search_incidents(
+    db: Session,
+    organization_id,
+    q: str,
+    limit: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Tuple[Incident, float]], Optional[str]]:
+    """
+    Full-text search over the titles, descriptions and update messages of
+    an organization's incidents, most relevant first.
+
+    ``q`` uses web search syntax ("quoted phrases", or, -excluded). Matches
+    are found through the GIN indexes on the search_vector columns; an
+    incident ranks by its best match, title matches weighing most. Only
+    incidents created in [start, end) are returned. Returns (incident,
+    rank) pairs and the cursor of the next page.
+    """
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    incident_filters = [Incident.organization_id == organization_id]
+    if start:
+        incident_filters.append(Incident.created_at >= start)
+    if end:
+        incident_filters.append(Incident.created_at < end)
+
+    hits = union_all(
+        select(
+            Incident.id.label("incident_id"),
+            func.ts_rank(Incident.search_vector, query).label("rank"),
+        )
+        .where(Incident.search_vector.op("@@")(query), *incident_filters),
+        select(
+            IncidentUpdate.incident_id,
+            func.ts_rank(IncidentUpdate.search_vector, query),
+        )
+        .join(Incident, Incident.id == IncidentUpdate.incident_id)
+        .where(IncidentUpdate.search_vector.op("@@")(query), *incident_filters),
+    ).subquery("hits")
+    best = (
+        # ts_rank returns real, which does not survive a round trip through
+        # the cursor's decimal text; double precision does
+        select(hits.c.incident_id, cast(func.max(hits.c.rank), DOUBLE_PRECISION).label("rank"))
+        .group_by(hits.c.incident_id)
+        .subquery("best")
+    )
+
+    statement = select(Incident, best.c.rank).join(best, best.c.incident_id == Incident.id)
+    if cursor:
+        rank, created_at, id = decode_ranked_cursor(cursor)
+        statement = statement.where(
+            tuple_(best.c.rank, Incident.created_at, Incident.id) < tuple_(rank, created_at, id)
+        )
+    rows = db.execute(
+        statement
+        .order_by(best.c.rank.desc(), Incident.created_at.desc(), Incident.id.desc())
+        .limit(limit + 1)
+    ).all()
+
+    results = [(incident, rank) for incident, rank in rows]
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        last, rank = results[-1]
+        next_cursor = encode_ranked_cursor(rank, last.created_at, last.id)
+    return results, next_cursor
+
+def _first_identified():
+    """
+    When each Incident row first left INVESTIGATING, resolved with one seek
+    on the (incident_id, created_at, id) index of its updates.
+    """
+    return (
+        select(func.min(IncidentUpdate.created_at).label("identified_at"))
+        .where(
+            IncidentUpdate.incident_id == Incident.id,
+            IncidentUpdate.status != IncidentStatus.INVESTIGATING,
+        )
+        .lateral("first_identified")
+    )
+
+def get_incident_metrics(db: Session, organization_id, start: datetime, end: datetime, group_by: str) -> dict:
+    """
+    Reliability metrics of the incidents an organization opened in
+    [start, end), per service, impact or UTC week and in total.
+
+    Time to resolve runs from creation to resolved_at. Time to identify
+    runs from creation to the first update moving the incident past
+    INVESTIGATING. Everything is aggregated in one GROUPING SETS query, so
+    only one row per group leaves the database.
+    """
+    identified = _first_identified()
+    time_to_resolve = func.extract("epoch", Incident.resolved_at - Incident.created_at)
+    time_to_identify = func.extract("epoch", identified.c.identified_at - Incident.created_at)
+
+    if group_by == "service":
+        key, label = Incident.service_id, Service.name
+    elif group_by == "impact":
+        key = label = Incident.impact
+    else:
+        key = label = func.date(func.date_trunc("week", func.timezone("UTC", Incident.created_at)))
+
+    statement = (
+        select(
+            func.grouping(key).label("is_total"),
+            key.label("key"),
+            label.label("label") if label is not key else literal(None).label("label"),
+            func.count().label("incident_count"),
+            func.count(Incident.resolved_at).label("resolved_count"),
+            func.count().filter(Incident.is_active).label("active_count"),
+            func.avg(time_to_resolve).label("mttr_seconds"),
+            func.percentile_cont(0.5).within_group(time_to_resolve).label("median_ttr_seconds"),
+            func.count(identified.c.identified_at).label("identified_count"),
+            func.avg(time_to_identify).label("mtti_seconds"),
+        )
+        .select_from(Incident)
+        .outerjoin(identified, true())
+        .where(
+            Incident.organization_id == organization_id,
+            Incident.created_at >= start,
+            Incident.created_at < end,
+        )
+    )
+    if group_by == "service":
+        statement = statement.join(Service, Service.id == Incident.service_id).group_by(
+            func.grouping_sets(tuple_(key, label), tuple_())
+        )
+    else:
+        statement = statement.group_by(func.grouping_sets(key, tuple_()))
+    rows = db.execute(statement.order_by(label, key)).all()
+
+    def metrics(row) -> dict:
+        return {
+            "incident_count": row.incident_count,
+            "resolved_count": row.resolved_count,
+            "active_count": row.active_count,
+            "mttr_seconds": float(row.mttr_seconds) if row.mttr_seconds is not None else None,
+            "median_ttr_seconds": row.median_ttr_seconds,
+            "identified_count": row.identified_count,
+            "mtti_seconds": float(row.mtti_seconds) if row.mtti_seconds is not None else None,
+        }
+
+    total = {"incident_count": 0, "resolved_count": 0, "active_count": 0, "identified_count": 0}
+    groups = []
+    for row in rows:
+        if row.is_total:
+            total = metrics(row)
+            continue
+        row_key = row.key.value if hasattr(row.key, "value") else str(row.key)
+        groups.append({"key": row_key, "label": row.label or row_key, **metrics(row)})
+    return {"start": start, "end": end, "group_by": group_by, "total": total, "groups": groups}
@@ -0,0 +1,112 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, select, true, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.service import Service, ServiceStatus, ServiceStatusHistory, ServiceStatusVersion
+
+def get_status_counts(db: Session, organization_id) -> Dict[str, int]:
+    """
+    Count the services of an organization per status with a single GROUP BY.
+    """
+    rows = (
+        db.query(Service.status, func.count(Service.id))
+        .filter(Service.organization_id == organization_id)
+        .group_by(Service.status)
+        .all()
+    )
+    counts = {service_status.value: 0 for service_status in ServiceStatus}
+    counts.update({service_status: count for service_status, count in rows})
+    return counts
+
+def get_status_version(db: Session, organization_id) -> Optional[int]:
+    """Current services version of an organization, None until its services first change."""
+    return db.scalar(
+        select(ServiceStatusVersion.version)
+        .where(ServiceStatusVersion.organization_id == organization_id)
+    )
+
+def bump_status_version(db: Session, organization_ids: Iterable) -> None:
+    """
+    Mark the services of these organizations as changed. Runs in the
+    caller's transaction; organizations are bumped in id order so
+    concurrent writers lock their rows in the same order.
+    """
+    for organization_id in sorted(set(organization_ids)):
+        statement = insert(ServiceStatusVersion).values(organization_id=organization_id, version=1)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[ServiceStatusVersion.organization_id],
+            set_={"version": ServiceStatusVersion.version + 1},
+        ))
+
+def get_status_summary(db: Session, organization_id, include_services: bool = True) -> dict:
+    """
+    Build the public status summary (counts and optionally the service list) for an organization.
+    """
+    counts = get_status_counts(db, organization_id)
+    summary = {
+        "total_services": sum(counts.values()),
+        "operational_count": counts[ServiceStatus.OPERATIONAL.value],
+        "degraded_count": counts[ServiceStatus.DEGRADED.value],
+        "partial_outage_count": counts[ServiceStatus.PARTIAL_OUTAGE.value],
+        "major_outage_count": counts[ServiceStatus.MAJOR_OUTAGE.value],
+    }
+    if include_services:
+        # Only the columns the public summary exposes, no ORM hydration
+        summary["services"] = (
+            db.query(Service.id, Service.name, Service.status, Service.updated_at)
+            .filter(Service.organization_id == organization_id)
+            .order_by(Service.name)
+            .all()
+        )
+    return summary
+
+def get_service_with_history(
+    db: Session,
+    service_id,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[Optional[Service], List, Optional[str]]:
+    """
+    Load a service and its latest ``limit`` status changes, newest first,
+    in a single query: the history is a LATERAL subquery seeking the
+    (service_id, created_at, id) index and selecting only the columns the
+    response needs. Returns the service (None if missing), the history
+    rows and the cursor of the next older page.
+    """
+    history = select(
+        ServiceStatusHistory.id,
+        ServiceStatusHistory.old_status,
+        ServiceStatusHistory.new_status,
+        ServiceStatusHistory.notes,
+        ServiceStatusHistory.created_at,
+    ).where(ServiceStatusHistory.service_id == Service.id)
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        history = history.where(
+            tuple_(ServiceStatusHistory.created_at, ServiceStatusHistory.id) < tuple_(created_at, id)
+        )
+    history = (
+        history
+        .order_by(ServiceStatusHistory.created_at.desc(), ServiceStatusHistory.id.desc())
+        .limit(limit + 1)
+        .lateral("history")
+    )
+
+    rows = db.execute(
+        select(Service, history)
+        .select_from(Service)
+        .outerjoin(history, true())
+        .where(Service.id == service_id)
+        .order_by(history.c.created_at.desc(), history.c.id.desc())
+    ).all()
+    if not rows:
+        return None, [], None
+
+    service = rows[0][0]
+    entries = [row for row in rows if row.id is not None]
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_cursor(entries[-1].created_at, entries[-1].id)
+    return service, entries, next_cursor
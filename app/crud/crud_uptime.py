@@ -0,0 +1,291 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy import and_, case, func, select, text, true
+from sqlalchemy.dialects.postgresql import array, insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.service import Service, ServiceStatus, ServiceStatusHistory, ServiceStatusDaily
+
+UP_STATUSES = (ServiceStatus.OPERATIONAL.value, ServiceStatus.DEGRADED.value)
+
+# Bucket boundaries are aligned to this Monday so weekly buckets start on Mondays
+BUCKET_ORIGIN = datetime(2000, 1, 3, tzinfo=timezone.utc)
+
+# Time spent in each status per bucket. Every status interval is expanded
+# only into the buckets it overlaps, so the work is O(transitions + buckets)
+# and the result is at most one row per bucket and status.
+TIMELINE_QUERY = text("""
+    WITH transitions AS (
+        SELECT created_at AS started_at, new_status AS status, true AS is_transition
+        FROM service_status_history
+        WHERE service_id = :service_id AND created_at > :start AND created_at < :end
+        UNION ALL
+        (
+            SELECT CAST(:start AS timestamptz), new_status, false
+            FROM service_status_history
+            WHERE service_id = :service_id AND created_at <= :start
+            ORDER BY created_at DESC
+            LIMIT 1
+        )
+    ),
+    intervals AS (
+        SELECT status, started_at, is_transition,
+               lead(started_at, 1, least(CAST(:end AS timestamptz), now()))
+                   OVER (ORDER BY started_at) AS ended_at
+        FROM transitions
+    )
+    SELECT bucket,
+           status,
+           sum(extract(epoch FROM least(ended_at, bucket + :width) - greatest(started_at, bucket))) AS seconds,
+           count(*) FILTER (
+               WHERE is_transition AND bucket = date_bin(:width, started_at, :origin)
+           ) AS transition_count
+    FROM intervals,
+         LATERAL generate_series(
+             date_bin(:width, started_at, :origin),
+             ended_at - interval '1 microsecond',
+             :width
+         ) AS bucket
+    WHERE ended_at > started_at
+    GROUP BY bucket, status
+""")
+
+def _seconds_column(status: str) -> str:
+    return f"{status}_seconds"
+
+def _last_transition():
+    """Latest history entry of each Service row, resolved with one index seek."""
+    return (
+        select(ServiceStatusHistory.created_at.label("changed_at"))
+        .where(ServiceStatusHistory.service_id == Service.id)
+        .order_by(ServiceStatusHistory.created_at.desc())
+        .limit(1)
+        .lateral("last_transition")
+    )
+
+def _split_by_day(start: datetime, end: datetime) -> Iterable[Tuple[date, int]]:
+    """Yield (UTC day, seconds) for every day overlapped by [start, end)."""
+    start = start.astimezone(timezone.utc)
+    end = end.astimezone(timezone.utc)
+    while start < end:
+        next_day = datetime.combine(start.date() + timedelta(days=1), time.min, tzinfo=timezone.utc)
+        segment_end = min(next_day, end)
+        yield start.date(), int((segment_end - start).total_seconds())
+        start = segment_end
+
+def _empty_day(service_id, day: date) -> dict:
+    row = {
+        "service_id": service_id,
+        "day": day,
+        "worst_status": ServiceStatus.OPERATIONAL.value,
+        "transition_count": 0,
+    }
+    for status in ServiceStatus.values():
+        row[_seconds_column(status)] = 0
+    return row
+
+def _worse(a: str, b: str) -> str:
+    return a if ServiceStatus.severity(a) >= ServiceStatus.severity(b) else b
+
+def _severity(column):
+    return func.array_position(array(ServiceStatus.values()), column)
+
+def record_transitions(db: Session, transitions: Dict[object, Tuple[str, str]]) -> None:
+    """
+    Fold status transitions into the daily rollups.
+
+    ``transitions`` maps service ids to (old_status, new_status) and must be
+    recorded before the matching history rows are added, since the time
+    spent in ``old_status`` is measured from the previous history entry.
+    Runs in the caller's transaction so rollups commit with the history.
+    """
+    if not transitions:
+        return
+
+    now = db.scalar(select(func.now())).astimezone(timezone.utc)
+    horizon = now - timedelta(days=settings.UPTIME_ROLLUP_MAX_DAYS)
+    last_transition = _last_transition()
+    since = dict(
+        db.execute(
+            select(Service.id, func.coalesce(last_transition.c.changed_at, Service.created_at))
+            .select_from(Service)
+            .outerjoin(last_transition, true())
+            .where(Service.id.in_(transitions))
+        ).all()
+    )
+
+    rows: Dict[Tuple[object, date], dict] = {}
+    for service_id, (old_status, new_status) in transitions.items():
+        start = max(since.get(service_id, now), horizon)
+        for day, seconds in _split_by_day(start, now):
+            row = rows.setdefault((service_id, day), _empty_day(service_id, day))
+            row[_seconds_column(old_status)] += seconds
+            row["worst_status"] = _worse(row["worst_status"], old_status)
+        row = rows.setdefault((service_id, now.date()), _empty_day(service_id, now.date()))
+        row["transition_count"] += 1
+        row["worst_status"] = _worse(row["worst_status"], new_status)
+
+    statement = insert(ServiceStatusDaily).values(list(rows.values()))
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[ServiceStatusDaily.service_id, ServiceStatusDaily.day],
+        set_={
+            **{
+                _seconds_column(status): getattr(ServiceStatusDaily, _seconds_column(status)) + getattr(excluded, _seconds_column(status))
+                for status in ServiceStatus.values()
+            },
+            "transition_count": ServiceStatusDaily.transition_count + excluded.transition_count,
+            "worst_status": case(
+                (_severity(excluded.worst_status) > _severity(ServiceStatusDaily.worst_status), excluded.worst_status),
+                else_=ServiceStatusDaily.worst_status
+            ),
+        }
+    )
+    db.execute(statement)
+
+def _uptime_percentage(day: dict) -> float:
+    total = sum(day[_seconds_column(status)] for status in ServiceStatus.values())
+    if not total:
+        return None
+    up = sum(day[_seconds_column(status)] for status in UP_STATUSES)
+    return round(100.0 * up / total, 4)
+
+def get_organization_uptime(db: Session, organization_id, days: int) -> dict:
+    """
+    Daily uptime series of every service in an organization.
+
+    Closed intervals come from the rollups; the time since each service's
+    last transition is added on the fly. Degraded counts as up, partial and
+    major outages count as down.
+    """
+    now = db.scalar(select(func.now())).astimezone(timezone.utc)
+    end = now.date()
+    start = end - timedelta(days=days - 1)
+    last_transition = _last_transition()
+    rows = db.execute(
+        select(
+            Service.id,
+            Service.name,
+            Service.status,
+            func.coalesce(last_transition.c.changed_at, Service.created_at).label("changed_at"),
+            ServiceStatusDaily,
+        )
+        .select_from(Service)
+        .outerjoin(last_transition, true())
+        .outerjoin(
+            ServiceStatusDaily,
+            and_(ServiceStatusDaily.service_id == Service.id, ServiceStatusDaily.day >= start)
+        )
+        .where(Service.organization_id == organization_id)
+        .order_by(Service.name, Service.id, ServiceStatusDaily.day)
+    ).all()
+
+    services: Dict[object, dict] = {}
+    series: Dict[object, Dict[date, dict]] = defaultdict(dict)
+    for service_id, name, current_status, changed_at, rollup in rows:
+        services.setdefault(service_id, {
+            "service_id": service_id,
+            "name": name,
+            "status": current_status,
+            "changed_at": changed_at,
+        })
+        if rollup is not None:
+            series[service_id][rollup.day] = {
+                column: getattr(rollup, column)
+                for column in [_seconds_column(status) for status in ServiceStatus.values()]
+                + ["worst_status", "transition_count"]
+            }
+
+    result: List[dict] = []
+    for service_id, service in services.items():
+        service_days = series[service_id]
+        open_from = max(service["changed_at"], datetime.combine(start, time.min, tzinfo=timezone.utc))
+        for day, seconds in _split_by_day(open_from, now):
+            entry = service_days.setdefault(day, _empty_day(service_id, day))
+            entry[_seconds_column(service["status"])] += seconds
+            entry["worst_status"] = _worse(entry["worst_status"], service["status"])
+
+        daily = []
+        totals = {_seconds_column(status): 0 for status in ServiceStatus.values()}
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            entry = service_days.get(day)
+            if entry is None:
+                daily.append({"day": day, "uptime_percentage": None})
+                continue
+            for column in totals:
+                totals[column] += entry[column]
+            daily.append({
+                "day": day,
+                "uptime_percentage": _uptime_percentage(entry),
+                **{key: value for key, value in entry.items() if key not in ("service_id", "day")},
+            })
+
+        result.append({
+            "service_id": service_id,
+            "name": service["name"],
+            "status": service["status"],
+            "uptime_percentage": _uptime_percentage(totals),
+            "days": daily,
+        })
+
+    return {"start": start, "end": end, "services": result}
+
+def align_to_bucket(moment: datetime, width: timedelta) -> datetime:
+    """Floor a timestamp to the start of its bucket."""
+    return moment - (moment - BUCKET_ORIGIN) % width
+
+def get_status_timeline(db: Session, service_id, start: datetime, end: datetime, width: timedelta) -> List[dict]:
+    """
+    Fixed-size buckets between ``start`` and ``end`` (both aligned to
+    ``width``) with the worst status, the fraction of covered time spent in
+    each status and the number of transitions. Buckets before the service
+    existed have no worst status.
+    """
+    buckets: Dict[datetime, dict] = {}
+    moment = start
+    while moment < end:
+        buckets[moment] = {
+            "start": moment,
+            "worst_status": None,
+            "transition_count": 0,
+            "seconds": {status: 0.0 for status in ServiceStatus.values()},
+        }
+        moment += width
+
+    rows = db.execute(
+        TIMELINE_QUERY,
+        {
+            "service_id": service_id,
+            "start": start,
+            "end": end,
+            "width": width,
+            "origin": BUCKET_ORIGIN,
+        }
+    ).all()
+    for bucket_start, status, seconds, transition_count in rows:
+        bucket = buckets.get(bucket_start.astimezone(timezone.utc))
+        if bucket is None:
+            continue
+        bucket["seconds"][status] += float(seconds)
+        bucket["transition_count"] += transition_count
+        if seconds > 0:
+            bucket["worst_status"] = (
+                status if bucket["worst_status"] is None
+                else _worse(bucket["worst_status"], status)
+            )
+
+    timeline = []
+    for bucket in buckets.values():
+        covered = sum(bucket["seconds"].values())
+        timeline.append({
+            "start": bucket["start"],
+            "worst_status": bucket["worst_status"],
+            "transition_count": bucket["transition_count"],
+            "status_fractions": {
+                status: round(seconds / covered, 6) if covered else 0.0
+                for status, seconds in bucket.pop("seconds").items()
+            },
+        })
+    return timeline
@@ -2,6 +2,7 @@ import logging
 from sqlalchemy.exc import ProgrammingError
 from app.db.session import engine
 from app.db.base import Base  # This now includes all models
+from app.db.partitions import ensure_partitions
 
 logger = logging.getLogger(__name__)
 
@@ -9,6 +10,8 @@ def init_db():
     try:
         # Create all tables
         Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            ensure_partitions(connection)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
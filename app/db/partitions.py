@@ -0,0 +1,132 @@
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tables partitioned by month on created_at
+STATUS_HISTORY_TABLE = "service_status_history"
+
+PARTITION_SUFFIX = re.compile(r"_(\d{4})_(\d{2})$")
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_{month:%Y_%m}"
+
+def _exists(connection: Connection, name: str) -> bool:
+    return connection.execute(text("SELECT to_regclass(:name)"), {"name": f'"{name}"'}).scalar() is not None
+
+def create_partition(connection: Connection, table: str, month: date) -> None:
+    """
+    Create the partition holding ``month`` if it does not exist yet. Rows
+    of that month already in the default partition are moved into it, since
+    Postgres refuses to create a partition that the default one overlaps.
+    """
+    name = partition_name(table, month)
+    if _exists(connection, name):
+        return
+    start = f"{month.isoformat()} 00:00:00+00"
+    end = f"{add_months(month, 1).isoformat()} 00:00:00+00"
+    default = f"{table}_default"
+    moved = f"{name}_moved"
+    has_strays = _exists(connection, default) and connection.execute(text(
+        f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE created_at >= :start AND created_at < :end)'
+    ), {"start": start, "end": end}).scalar()
+
+    if has_strays:
+        connection.execute(text(f'CREATE TEMPORARY TABLE "{moved}" (LIKE "{table}")'))
+        connection.execute(text(
+            f'WITH rows AS (DELETE FROM "{default}" WHERE created_at >= :start AND created_at < :end RETURNING *) '
+            f'INSERT INTO "{moved}" SELECT * FROM rows'
+        ), {"start": start, "end": end})
+    connection.execute(text(
+        f'CREATE TABLE "{name}" PARTITION OF "{table}" '
+        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+    ))
+    if has_strays:
+        count = connection.execute(text(f'INSERT INTO "{table}" SELECT * FROM "{moved}"')).rowcount
+        connection.execute(text(f'DROP TABLE "{moved}"'))
+        logger.warning(f"Moved {count} rows from {default} into {name}")
+
+def create_default_partition(connection: Connection, table: str) -> None:
+    """
+    Catch-all partition so writes never fail when the maintenance job is
+    late. It is expected to stay empty; rows that do land in it are moved
+    to their month's partition when ``create_partition`` creates it.
+    """
+    connection.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{table}_default" PARTITION OF "{table}" DEFAULT'
+    ))
+
+def ensure_partitions(
+    connection: Connection,
+    table: str = STATUS_HISTORY_TABLE,
+    since: Optional[date] = None,
+    months_ahead: Optional[int] = None,
+) -> None:
+    """Create monthly partitions from ``since`` (default: this month) up to ``months_ahead`` months ahead."""
+    if months_ahead is None:
+        months_ahead = settings.STATUS_HISTORY_PARTITIONS_AHEAD
+    current = month_start(datetime.now(timezone.utc).date())
+    month = month_start(since) if since else current
+    last = add_months(current, months_ahead)
+    while month <= last:
+        create_partition(connection, table, month)
+        month = add_months(month, 1)
+    create_default_partition(connection, table)
+
+def list_partitions(connection: Connection, table: str = STATUS_HISTORY_TABLE) -> List[Tuple[str, date]]:
+    """Monthly partitions currently attached to ``table``, oldest first."""
+    rows = connection.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :table"
+    ), {"table": table}).scalars().all()
+    partitions = []
+    for name in rows:
+        match = PARTITION_SUFFIX.search(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+def apply_retention(
+    connection: Connection,
+    table: str = STATUS_HISTORY_TABLE,
+    retention_months: Optional[int] = None,
+    archive: Optional[bool] = None,
+) -> List[str]:
+    """
+    Remove partitions whose whole month is older than the retention window.
+
+    Archived partitions are detached and kept as standalone tables for
+    export; otherwise they are dropped. Either way this is a metadata
+    operation instead of a row-by-row DELETE. Returns the affected names.
+    """
+    if retention_months is None:
+        retention_months = settings.STATUS_HISTORY_RETENTION_MONTHS
+    if archive is None:
+        archive = settings.STATUS_HISTORY_ARCHIVE
+    if retention_months <= 0:
+        return []
+
+    cutoff = add_months(month_start(datetime.now(timezone.utc).date()), -retention_months)
+    expired = [name for name, month in list_partitions(connection, table) if month < cutoff]
+    for name in expired:
+        if archive:
+            connection.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+            logger.info(f"Detached partition {name} for archival")
+        else:
+            connection.execute(text(f'DROP TABLE "{name}"'))
+            logger.info(f"Dropped partition {name}")
+    return expired
@@ -0,0 +1,100 @@
+import threading
+import time
+from typing import Dict, Optional, Sequence, Type
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool
+
+# Upper bounds (seconds) of the checkout wait time histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """
+    Bucketed observations with a running count and sum. Not locked, the
+    owner serializes access.
+    """
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = next(
+            (i for i, bound in enumerate(self.bounds) if value <= bound),
+            len(self.bounds)
+        )
+        self.buckets[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def buckets_snapshot(self) -> Dict[str, int]:
+        histogram = {str(bound): count for bound, count in zip(self.bounds, self.buckets)}
+        histogram["+Inf"] = self.buckets[-1]
+        return histogram
+
+class PoolMetrics:
+    """Checkout wait times and timeouts of one connection pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine: Optional[Engine] = None
+        self._lock = threading.Lock()
+        self._waits = Histogram(WAIT_BUCKETS)
+        self._timeouts = 0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._waits.observe(seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self._timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = {
+                "checkouts": self._waits.count,
+                "wait_seconds_total": round(self._waits.sum, 6),
+                "wait_seconds_histogram": self._waits.buckets_snapshot(),
+                "checkout_timeouts": self._timeouts,
+            }
+        pool = self.engine.pool if self.engine is not None else None
+        if pool is not None and hasattr(pool, "checkedout"):
+            stats.update({
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            })
+        return stats
+
+def instrumented_pool(pool_class: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """
+    Subclass ``pool_class`` so every checkout records its wait time in
+    ``metrics``. Being a class rather than a pool instance, it survives
+    the pool being recreated by Engine.dispose().
+    """
+    class InstrumentedPool(pool_class):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                metrics.record_timeout()
+                raise
+            metrics.record_wait(time.perf_counter() - start)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+
+def get_pool_stats() -> Dict[str, dict]:
+    return {
+        metrics.name: metrics.snapshot()
+        for metrics in (sync_pool_metrics, async_pool_metrics)
+    }
@@ -1,17 +1,54 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.db.pool_metrics import async_pool_metrics, instrumented_pool, sync_pool_metrics
+
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+}
 
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,  # Enable connection pool "pre-ping" feature
-    echo=True  # Add this line for debugging
+    poolclass=instrumented_pool(QueuePool, sync_pool_metrics),
+    echo=settings.DB_ECHO,
+    **POOL_OPTIONS
 )
+sync_pool_metrics.engine = engine
 
 # Create SessionLocal class with sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def get_async_database_url() -> str:
+    """ASYNC_DATABASE_URL, or DATABASE_URL switched to the asyncpg driver."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    return url.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+# Async engine for async endpoints, so database round trips do not block the event loop
+async_engine = create_async_engine(
+    get_async_database_url(),
+    pool_pre_ping=True,
+    poolclass=instrumented_pool(AsyncAdaptedQueuePool, async_pool_metrics),
+    echo=settings.DB_ECHO,
+    **POOL_OPTIONS
+)
+async_pool_metrics.engine = async_engine.sync_engine
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
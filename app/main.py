@@ -1,7 +1,14 @@
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.db.session import engine, async_engine
+from app.db.partitions import ensure_partitions
+from app.api.v1.endpoints.websocket import manager
+from app.core.outbox import outbox_dispatcher
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -16,10 +23,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.on_event("startup")
+def create_upcoming_partitions():
+    """Make sure the current and next months have history partitions."""
+    try:
+        with engine.begin() as connection:
+            ensure_partitions(connection)
+    except Exception as e:
+        logger.error(f"Error creating history partitions: {e}")
+
+@app.on_event("startup")
+async def start_broadcasts():
+    await manager.start()
+    await outbox_dispatcher.start(manager.broadcast_to_organization)
+
+@app.on_event("shutdown")
+async def stop_broadcasts():
+    await outbox_dispatcher.stop()
+    await manager.stop()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -1,8 +1,9 @@
 from .organization import Organization
 from .user import User
-from .service import Service, ServiceStatus
+from .service import Service, ServiceStatus, ServiceStatusHistory, ServiceStatusDaily, ServiceStatusVersion
 from .incident import Incident, IncidentStatus, IncidentImpact
 from .incident_update import IncidentUpdate
+from .outbox import OutboxEvent
 
 # This will help alembic detect models
 __all__ = [
@@ -10,10 +11,14 @@ __all__ = [
     "User",
     "Service",
     "ServiceStatus",
+    "ServiceStatusHistory",
+    "ServiceStatusDaily",
+    "ServiceStatusVersion",
     "Incident",
     "IncidentStatus",
     "IncidentImpact",
-    "IncidentUpdate"
+    "IncidentUpdate",
+    "OutboxEvent"
 ]
 
 # This file can be empty or just contain the version
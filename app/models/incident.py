@@ -1,15 +1,27 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, Enum
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Boolean, Column, Computed, String, ForeignKey, DateTime, Enum, Index, true
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from app.db.base_class import Base, TimestampMixin, UUIDMixin
 from enum import Enum as PyEnum
 
+# Text search configuration of the search_vector columns, see app.crud.crud_incident
+SEARCH_CONFIG = "english"
+
 class IncidentStatus(str, PyEnum):
     INVESTIGATING = "INVESTIGATING"
     IDENTIFIED = "IDENTIFIED"
     MONITORING = "MONITORING"
     RESOLVED = "RESOLVED"
 
+# Statuses an incident may move to from each status. Unresolved incidents
+# move freely and can always be resolved; resolved ones can only be reopened.
+INCIDENT_TRANSITIONS = {
+    IncidentStatus.INVESTIGATING: set(IncidentStatus),
+    IncidentStatus.IDENTIFIED: set(IncidentStatus),
+    IncidentStatus.MONITORING: set(IncidentStatus),
+    IncidentStatus.RESOLVED: {IncidentStatus.RESOLVED, IncidentStatus.INVESTIGATING},
+}
+
 class IncidentImpact(str, PyEnum):
     NONE = "NONE"
     MINOR = "MINOR"
@@ -18,12 +30,36 @@ class IncidentImpact(str, PyEnum):
 
 class Incident(Base, TimestampMixin, UUIDMixin):
     __tablename__ = "incidents"
+    __table_args__ = (
+        # Keyset pagination indexes, see app.core.pagination
+        Index('ix_incidents_created_at_id', 'created_at', 'id'),
+        Index('ix_incidents_organization_id_created_at_id', 'organization_id', 'created_at', 'id'),
+        Index('ix_incidents_service_id_created_at_id', 'service_id', 'created_at', 'id'),
+        Index('ix_incidents_search_vector', 'search_vector', postgresql_using='gin'),
+        # Active incidents only, so active listings stay O(active)
+        Index(
+            'ix_incidents_active_organization_id_created_at_id',
+            'organization_id', 'created_at', 'id',
+            postgresql_where='is_active'
+        ),
+    )
 
     title = Column(String, nullable=False)
     description = Column(String, nullable=False)
     status = Column(Enum(IncidentStatus), default=IncidentStatus.INVESTIGATING)
     impact = Column(Enum(IncidentImpact), default=IncidentImpact.MINOR)
     resolved_at = Column(DateTime(timezone=True), nullable=True)
+    # False once resolved; maintained by app.crud.crud_incident.set_incident_status
+    is_active = Column(Boolean, nullable=False, default=True, server_default=true())
+    # Maintained by Postgres on write; deferred so regular reads skip it
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')",
+            persisted=True
+        )
+    ))
 
     # Foreign Keys
     service_id = Column(UUID(as_uuid=True), ForeignKey("services.id"), nullable=False)
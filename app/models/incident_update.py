@@ -1,12 +1,16 @@
-from sqlalchemy import Column, String, ForeignKey, Enum, DateTime, func
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Computed, String, ForeignKey, Enum, DateTime, Index, func
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 import uuid
 from app.db.base_class import Base
-from app.models.incident import IncidentStatus
+from app.models.incident import SEARCH_CONFIG, IncidentStatus
 
 class IncidentUpdate(Base):
     __tablename__ = "incident_updates"
+    __table_args__ = (
+        Index('ix_incident_updates_incident_id_created_at_id', 'incident_id', 'created_at', 'id'),
+        Index('ix_incident_updates_search_vector', 'search_vector', postgresql_using='gin'),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     message = Column(String, nullable=False)
@@ -15,6 +19,11 @@ class IncidentUpdate(Base):
     created_by_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Maintained by Postgres on write; deferred so regular reads skip it
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}', message)", persisted=True)
+    ))
 
     # Relationships
     incident = relationship("Incident", back_populates="updates")
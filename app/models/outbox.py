@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Identity
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class OutboxEvent(Base):
+    """
+    Realtime event waiting to be broadcast. Rows are written in the same
+    transaction as the change they describe and removed by the outbox
+    dispatcher once published, see app.core.outbox.
+    """
+    __tablename__ = "outbox_events"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
+    payload = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
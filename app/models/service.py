@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, ForeignKey, CheckConstraint
+from sqlalchemy import BigInteger, Column, String, ForeignKey, CheckConstraint, Index, Integer, Date, DateTime, PrimaryKeyConstraint, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.db.base_class import Base, TimestampMixin, UUIDMixin
@@ -14,6 +14,11 @@ class ServiceStatus(str, PyEnum):
     def values(cls):
         return [e.value for e in cls]
 
+    @classmethod
+    def severity(cls, value) -> int:
+        """Rank of a status, members are declared from best to worst."""
+        return cls.values().index(cls(value).value)
+
 class Service(Base, TimestampMixin, UUIDMixin):
     __tablename__ = "services"
 
@@ -31,6 +36,9 @@ class Service(Base, TimestampMixin, UUIDMixin):
             status.in_(ServiceStatus.values()),
             name='valid_service_status'
         ),
+        # Covers the per-organization GROUP BY status used by the status summary
+        Index('ix_services_organization_id_status', 'organization_id', 'status'),
+        Index('ix_services_organization_id_created_at_id', 'organization_id', 'created_at', 'id'),
     )
 
     # Foreign Keys
@@ -40,10 +48,17 @@ class Service(Base, TimestampMixin, UUIDMixin):
     organization = relationship("Organization", back_populates="services")
     incidents = relationship("Incident", back_populates="service", cascade="all, delete-orphan")
     status_history = relationship("ServiceStatusHistory", back_populates="service", cascade="all, delete-orphan")
+    daily_status = relationship("ServiceStatusDaily", back_populates="service", cascade="all, delete-orphan", passive_deletes=True)
 
 class ServiceStatusHistory(Base, TimestampMixin, UUIDMixin):
+    """
+    Status transitions, range partitioned by month on created_at (see
+    app.db.partitions). Postgres requires the partition key in the primary
+    key, hence (id, created_at).
+    """
     __tablename__ = "service_status_history"
 
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, primary_key=True)
     service_id = Column(UUID(as_uuid=True), ForeignKey("services.id"), nullable=False)
     old_status = Column(String, nullable=False)
     new_status = Column(String, nullable=False)
@@ -59,6 +74,9 @@ class ServiceStatusHistory(Base, TimestampMixin, UUIDMixin):
             new_status.in_(ServiceStatus.values()),
             name='valid_new_status'
         ),
+        Index('ix_service_status_history_service_id_created_at_id', 'service_id', 'created_at', 'id'),
+        PrimaryKeyConstraint('id', 'created_at', name='service_status_history_pkey'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
     )
 
     # Relationships
@@ -67,7 +85,41 @@ class ServiceStatusHistory(Base, TimestampMixin, UUIDMixin):
     def __init__(self, **kwargs):
         # Validate status values before saving
         if 'old_status' in kwargs:
-            kwargs['old_status'] = str(kwargs['old_status'])
+            kwargs['old_status'] = ServiceStatus(kwargs['old_status']).value
         if 'new_status' in kwargs:
-            kwargs['new_status'] = str(kwargs['new_status'])
-        super().__init__(**kwargs) 
\ No newline at end of file
+            kwargs['new_status'] = ServiceStatus(kwargs['new_status']).value
+        super().__init__(**kwargs)
+
+class ServiceStatusDaily(Base):
+    """Per service, per UTC day rollup of the time spent in each status."""
+    __tablename__ = "service_status_daily"
+
+    service_id = Column(UUID(as_uuid=True), ForeignKey("services.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    operational_seconds = Column(Integer, nullable=False, default=0, server_default="0")
+    degraded_seconds = Column(Integer, nullable=False, default=0, server_default="0")
+    partial_outage_seconds = Column(Integer, nullable=False, default=0, server_default="0")
+    major_outage_seconds = Column(Integer, nullable=False, default=0, server_default="0")
+    worst_status = Column(String, nullable=False)
+    transition_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        CheckConstraint(
+            worst_status.in_(ServiceStatus.values()),
+            name='valid_worst_status'
+        ),
+    )
+
+    # Relationships
+    service = relationship("Service", back_populates="daily_status")
+
+class ServiceStatusVersion(Base):
+    """
+    Counter bumped in the same transaction as every change to the services
+    of an organization, so cached status snapshots can be revalidated with
+    a single primary key lookup.
+    """
+    __tablename__ = "service_status_versions"
+
+    organization_id = Column(UUID(as_uuid=True), ForeignKey("organizations.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1, server_default="1")
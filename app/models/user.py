@@ -1,10 +1,13 @@
-from sqlalchemy import Column, String, Boolean, ForeignKey
+from sqlalchemy import Column, String, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.db.base_class import Base, TimestampMixin, UUIDMixin
 
 class User(Base, TimestampMixin, UUIDMixin):
     __tablename__ = "users"
+    __table_args__ = (
+        Index('ix_users_organization_id_created_at_id', 'organization_id', 'created_at', 'id'),
+    )
 
     email = Column(String, unique=True, nullable=False)
     full_name = Column(String)
@@ -1,10 +1,16 @@
 from pydantic import BaseModel, UUID4, validator
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from app.models.incident import IncidentStatus, IncidentImpact
+from app.schemas import incident_update
 import uuid
 from enum import Enum
 
+class MetricsGrouping(str, Enum):
+    SERVICE = "service"
+    IMPACT = "impact"
+    WEEK = "week"
+
 class IncidentStatus(str, Enum):
     INVESTIGATING = "INVESTIGATING"
     IDENTIFIED = "IDENTIFIED"
@@ -52,6 +58,7 @@ class Incident(IncidentBase):
     organization_id: UUID4
     created_by_id: UUID4
     resolved_at: Optional[datetime] = None
+    is_active: bool = True
     created_at: datetime
     updated_at: datetime
 
@@ -65,6 +72,40 @@ class Incident(IncidentBase):
     class Config:
         from_attributes = True
 
+class IncidentWithUpdates(Incident):
+    updates: List[incident_update.IncidentUpdate]
+
+    class Config:
+        from_attributes = True
+
+class IncidentSearchResult(Incident):
+    rank: float
+
+    class Config:
+        from_attributes = True
+
+class IncidentMetricsValues(BaseModel):
+    incident_count: int
+    resolved_count: int
+    active_count: int
+    # Mean and median time from creation to resolution of resolved incidents
+    mttr_seconds: Optional[float] = None
+    median_ttr_seconds: Optional[float] = None
+    # Mean time from creation to the first update past INVESTIGATING
+    identified_count: int
+    mtti_seconds: Optional[float] = None
+
+class IncidentMetricsGroup(IncidentMetricsValues):
+    key: str
+    label: str
+
+class IncidentMetrics(BaseModel):
+    start: datetime
+    end: datetime
+    group_by: MetricsGrouping
+    total: IncidentMetricsValues
+    groups: List[IncidentMetricsGroup]
+
 def is_valid_uuid4(uuid_string):
     try:
         uuid_obj = uuid.UUID(uuid_string)
@@ -1,8 +1,9 @@
-from pydantic import BaseModel, constr, validator
-from typing import Optional, List
-from datetime import datetime
+from pydantic import BaseModel, Field, constr, validator
+from typing import Dict, Optional, List
+from datetime import date, datetime
 from app.models.service import ServiceStatus
 from uuid import UUID
+from enum import Enum
 
 class ServiceBase(BaseModel):
     name: constr(min_length=1, max_length=100, strip_whitespace=True)
@@ -35,6 +36,12 @@ class ServiceStatusUpdate(BaseModel):
     status: ServiceStatus
     notes: Optional[str] = None
 
+class ServiceStatusBulkItem(ServiceStatusUpdate):
+    service_id: UUID
+
+class ServiceStatusBulkUpdate(BaseModel):
+    updates: List[ServiceStatusBulkItem] = Field(..., min_length=1, max_length=1000)
+
 class ServiceStatusHistoryRead(BaseModel):
     id: UUID
     old_status: ServiceStatus
@@ -75,7 +82,47 @@ class ServiceStatusSummary(BaseModel):
     degraded_count: int
     partial_outage_count: int
     major_outage_count: int
-    services: List[ServiceStatusResponse]
+    services: Optional[List[ServiceStatusResponse]] = None
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class ServiceUptimeDay(BaseModel):
+    day: date
+    uptime_percentage: Optional[float] = None
+    operational_seconds: int = 0
+    degraded_seconds: int = 0
+    partial_outage_seconds: int = 0
+    major_outage_seconds: int = 0
+    worst_status: Optional[ServiceStatus] = None
+    transition_count: int = 0
+
+class ServiceUptime(BaseModel):
+    service_id: UUID
+    name: str
+    status: ServiceStatus
+    uptime_percentage: Optional[float] = None
+    days: List[ServiceUptimeDay]
+
+class OrganizationUptime(BaseModel):
+    start: date
+    end: date
+    services: List[ServiceUptime]
+
+class StatusBucket(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+
+class ServiceStatusBucket(BaseModel):
+    start: datetime
+    worst_status: Optional[ServiceStatus] = None
+    transition_count: int
+    status_fractions: Dict[ServiceStatus, float]
+
+class ServiceStatusTimeline(BaseModel):
+    service_id: UUID
+    bucket: StatusBucket
+    start: datetime
+    end: datetime
+    buckets: List[ServiceStatusBucket]
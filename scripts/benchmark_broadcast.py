@@ -0,0 +1,74 @@
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add the parent directory to Python path
+BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+sys.path.insert(0, BACKEND_DIR)
+
+from starlette.websockets import WebSocketState
+from app.core.broadcast import MemoryBroadcastBackend, encode_message
+from app.api.v1.endpoints.websocket import ConnectionManager
+
+SUBSCRIBERS = 20000
+ROUNDS = 5
+MESSAGE = {
+    "type": "INCIDENT_CREATED",
+    "data": {
+        "id": "9f6c1f0e-6f1a-4b8e-9a59-3d2b1f0c7a11",
+        "title": "Elevated error rates on the public API",
+        "description": "We are investigating increased 5xx responses from the API in eu-west-1.",
+        "status": "INVESTIGATING",
+        "impact": "MAJOR",
+        "service_id": "0b5c2a71-1f3e-4f55-8f3a-2a4c1e9d6b20",
+        "created_at": "2026-10-18T12:00:00+00:00",
+    },
+}
+
+class NullWebSocket:
+    """Accepts frames without doing any I/O, to isolate the broadcast cost."""
+    client_state = WebSocketState.CONNECTED
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        pass
+
+def per_socket_encoding():
+    """The previous behaviour: every subscriber encodes the message itself."""
+    for _ in range(SUBSCRIBERS):
+        json.dumps(MESSAGE)
+
+async def shared_frame(manager):
+    manager.deliver("org", MESSAGE)
+    for connection in manager.active_connections["org"]:
+        connection.queue.get_nowait()
+
+def report(name, seconds):
+    print(f"{name:<28} {seconds * 1e9 / SUBSCRIBERS:8.1f} ns per subscriber")
+
+async def main():
+    manager = ConnectionManager(queue_size=ROUNDS + 1, backend=MemoryBroadcastBackend)
+    for _ in range(SUBSCRIBERS):
+        await manager.connect(NullWebSocket(), "org")
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        per_socket_encoding()
+    report("json per subscriber", (time.perf_counter() - start) / ROUNDS)
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await shared_frame(manager)
+    report("shared frame, enqueue only", (time.perf_counter() - start) / ROUNDS)
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS * 1000):
+        encode_message(MESSAGE)
+    print(f"{'encode once':<28} {(time.perf_counter() - start) * 1e6 / (ROUNDS * 1000):8.1f} us per message")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,12 +8,15 @@ sys.path.insert(0, BACKEND_DIR)
 
 from app.db.session import engine
 from app.db.base_class import Base  # Import from base_class instead
+from app.db.partitions import ensure_partitions
 import app.models  # This ensures all models are loaded
 
 def create_tables():
     print("Creating database tables...")
     try:
         Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            ensure_partitions(connection)
         print("All tables created successfully!")
     except Exception as e:
         print(f"Error creating tables: {str(e)}")
@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+# Add the parent directory to Python path
+BACKEND_DIR = str(Path(__file__).resolve().parent.parent)
+sys.path.insert(0, BACKEND_DIR)
+
+from app.db.session import engine
+from app.db.partitions import ensure_partitions, apply_retention
+
+def manage_history_partitions():
+    """Create upcoming status history partitions and expire old ones. Run daily from cron."""
+    with engine.begin() as connection:
+        ensure_partitions(connection)
+        expired = apply_retention(connection)
+    print(f"Partitions up to date, expired: {', '.join(expired) or 'none'}")
+
+if __name__ == "__main__":
+    manage_history_partitions()
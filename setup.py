@@ -8,6 +8,7 @@ setup(
         "fastapi[all]",
         "sqlalchemy",
         "psycopg2-binary",
+        "asyncpg",
         "python-dotenv",
         "alembic",
         "pydantic-settings"